@@ -2,6 +2,7 @@
 # SPDX-License-Identifier: Apache-2.0
 import re
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Dict, Optional
 
 
@@ -68,29 +69,54 @@ def get_table_header(raw_table_data: str, categories: Dict[str, ParsingInfo]) ->
     return header, lines, regex_parsers
 
 
+_WORD = re.compile(r"\w+")
+# Column patterns that match exactly one whitespace separated token, and how to validate such a token
+_TOKEN_CHECKS = {
+    r"(\d+)": str.isdecimal,
+    r"(\w+)": _WORD.fullmatch,
+    r"(\S+)": bool,
+}
+
+
 def parse_table_lines(lines: str, regex_parsers: Dict[str, ParsingInfo]) -> dict:
     regex = re.compile(r"\s+".join([parsing_info.regex for parsing_info in regex_parsers.values()]))
+    # Resolved once per table instead of per line
+    categories = tuple(regex_parsers)
+    parsers = tuple(parsing_info.parse for parsing_info in regex_parsers.values())
+    # Only the first key is used at the moment, see the ToDo on ParsingInfo.key
+    key_index = {
+        parsing_info.key: index for index, parsing_info in enumerate(regex_parsers.values()) if parsing_info.key
+    }.get(1)
+    # Tables of plain tokens (e.g. /proc/diskstats) can be split instead of matched, lines that don't split into
+    # exactly one valid token per column still go through the regex
+    token_checks = [_TOKEN_CHECKS.get(parsing_info.regex) for parsing_info in regex_parsers.values()]
+    if None in token_checks:
+        token_checks = None
     result = {}
     for line in lines:
-        if match := re.search(regex, line):
-            parsed_key = {
-                parsing_info.key: parsing_info.parse(value)
-                for (_, parsing_info), value in zip(regex_parsers.items(), match.groups())
-                if parsing_info.key
-            }
-            if not parsed_key:
-                raise ValueError(f"Failed to specify a key for the parsed data: {regex_parsers}")
-
-            # Other part of using multiple column as keys. See aboves ToDo.
-            # result[".".join(str(i) for _, i in sorted(parsed_key.items()))] = {
-            result[parsed_key[1]] = {
-                category: parsing_info.parse(value)
-                for (category, parsing_info), value in zip(regex_parsers.items(), match.groups())
-            }
+        groups = None
+        if token_checks:
+            tokens = line.split()
+            if len(tokens) == len(token_checks) and all(check(token) for check, token in zip(token_checks, tokens)):
+                groups = tokens
+        if groups is None:
+            if not (match := regex.search(line)):
+                continue
+            groups = match.groups()
+        if key_index is None:
+            raise ValueError(f"Failed to specify a key for the parsed data: {regex_parsers}")
+        values = [parse(value) for parse, value in zip(parsers, groups)]
+        result[values[key_index]] = dict(zip(categories, values))
 
     return result
 
 
+_COMPACT_TIME = re.compile(r"(\d*\.?\d+)([d|h|m|s])?")
+_COMPACT_TIME_UNITS = {"d": 86400, "h": 3600, "m": 60, "s": 1}
+
+
+# Process tables repeat the same times a lot (e.g. "0s"), so parsed values are memoized
+@lru_cache(maxsize=4096)
 def convert_compact_format_to_seconds(time_str: str) -> float:
     """
     Converts a time string into seconds.
@@ -102,24 +128,25 @@ def convert_compact_format_to_seconds(time_str: str) -> float:
         float: The total number of seconds represented by the input time string.
 
     """
-    regex_pattern = r"(\d*\.?\d+)([d|h|m|s])?"
-
     total_seconds: float = 0
-    for match in re.finditer(regex_pattern, time_str):
+    for match in _COMPACT_TIME.finditer(time_str):
         value, unit = match.groups()
         if unit:
-            multiplier = {"d": 86400, "h": 3600, "m": 60, "s": 1}[unit]
-            total_seconds += float(value) * multiplier
+            total_seconds += float(value) * _COMPACT_TIME_UNITS[unit]
         else:
             total_seconds += float(value)
 
     return total_seconds
 
 
+_NON_DIGIT = re.compile(r"[^0-9]")
+
+
+@lru_cache(maxsize=4096)
 def convert_to_int(value):
     try:
         if isinstance(value, str):
-            value = "".join([d for d in "value" if d.isnumeric()])
+            value = _NON_DIGIT.sub("", value)
         return int(value)
     except ValueError:
         return 0
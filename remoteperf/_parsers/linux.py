@@ -2,7 +2,7 @@
 # SPDX-License-Identifier: Apache-2.0
 import re
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 from attrs import fields
 
@@ -19,40 +19,83 @@ from remoteperf.models.base import (
 from remoteperf.models.linux import LinuxCpuModeUsageInfo
 from remoteperf.utils.math import Vector
 
+# /proc/stat order
+_CPU_MODE_LABELS = tuple(f.name for f in fields(LinuxCpuModeUsageInfo))
+_IDLE_INDEX = _CPU_MODE_LABELS.index("idle")
+_MEMINFO_KEYS = frozenset(
+    ("MemTotal", "MemFree", "Cached", "SReclaimable", "Buffers", "Shmem", "MemAvailable", "SwapTotal", "SwapFree")
+)
+_CPU_STAT_RE = re.compile(r"(cpu\d*)\s+" + r"\s+".join([r"(\d+)"] * 10))
+_MEMINFO_RE = re.compile(r"^\s*(\w+):\s+(\d+)", re.MULTILINE)
+_TOTAL_CPU_STAT_RE = re.compile(r"cpu\s+" + r"\s+".join([r"(\d+)"] * 10))
+_PROC_STAT_COMPONENTS = [r"(?P<pid>\d+)", r"\((?P<name>\S+)\)", r"\S", *([r"(-?\d+)"] * 49)]
+_PROC_STAT_RE = re.compile(r"\s+".join(_PROC_STAT_COMPONENTS) + r"\n(?P<cmdline>.*)")
+_PROC_IO_RE = re.compile(r"\s+".join(_PROC_STAT_COMPONENTS) + r"".join([r"\n(\w+:\s+\d+)"] * 7) + r"\n(?P<cmdline>.*)")
+_SYSTEMD_PHASE_RE = re.compile(r"(?:(?P<mins>\d+)min)?\s?(?P<secs>\d+\.\d+)s\s\((?P<phase>.*?)\)")
+_SYSTEMD_TOTAL_RE = re.compile(r"=\s(?:(?P<mins>\d+)min)?\s?(?P<secs>\d+\.\d+)s")
+_SYSTEMD_TARGET_RE = re.compile(r"after\s(\d+\.\d+)s")
+_NET_DEV_DATA_RE = re.compile(r"(\S+):" + r"".join([r"\s+(\d+)"] * 16))
+_NET_DEV_TIME_RE = re.compile(r"(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}),(\d{6})\d*(\+\d{2}:\d{2})")
+
+
+def parse_proc_stat_raw(raw_cpu_usage: str) -> Dict[str, Vector]:
+    cpu_dict = {}
+    for line in raw_cpu_usage.splitlines():
+        # Most of /proc/stat (intr, ctxt, softirq...) is not cpu lines, skip those before tokenizing
+        if "cpu" not in line:
+            continue
+        cpu, *ticks = line.split(None, 11)[:11]
+        if (
+            len(ticks) == 10
+            and (cpu == "cpu" or (cpu.startswith("cpu") and cpu[3:].isdecimal()))
+            and all(tick.isdecimal() for tick in ticks)
+        ):
+            cpu_dict[cpu] = Vector(ticks)
+        # Plain split for the regular layout, the regex only handles what doesn't fit it
+        elif match := _CPU_STAT_RE.search(line):
+            cpu, *ticks = match.groups()
+            cpu_dict[cpu] = Vector(ticks)
+    return cpu_dict
+
 
 def parse_proc_stat(raw_cpu_usage_1: str, raw_cpu_usage_2: str, timestamp: Optional[datetime] = None) -> dict:
-    timestamp = timestamp or datetime.now()
+    return ticks_to_usage(parse_proc_stat_raw(raw_cpu_usage_1), parse_proc_stat_raw(raw_cpu_usage_2), timestamp)
 
-    pattern = re.compile(r"(cpu\d*)\s+" + r"\s+".join([r"(\d+)"] * 10))
 
-    cpu_dict_1 = {
-        matches.groups()[0]: Vector(matches.groups()[1:])
-        for line in raw_cpu_usage_1.splitlines()
-        if (matches := re.search(pattern, line)) and None not in matches.groups()
-    }
-    cpu_dict_2 = {
-        matches.groups()[0]: Vector(matches.groups()[1:])
-        for line in raw_cpu_usage_2.splitlines()
-        if (matches := re.search(pattern, line)) and None not in matches.groups()
-    }
-    if not set(cpu_dict_1) == set(cpu_dict_2):
-        raise ParsingError(f"Got incompatible cpu data: {raw_cpu_usage_1}\n{raw_cpu_usage_2}")
-
-    mode_usages = {}
-    # /proc/stat order
-    labels = [f.name for f in fields(LinuxCpuModeUsageInfo)]
-    for cpu in cpu_dict_1:
-        diffs = cpu_dict_2.get(cpu) - cpu_dict_1.get(cpu)
-        percentages = diffs / sum(diffs) * 100 if sum(diffs) > 0 else diffs
-        mode_usages[cpu] = LinuxCpuModeUsageInfo(**dict(zip(labels, percentages)))
-    if "cpu" not in mode_usages:
-        raise ParsingError(f"Raw data incomplete, missing 'cpu' line: {raw_cpu_usage_1}\n{raw_cpu_usage_2}")
-    total = mode_usages.pop("cpu")
+def ticks_to_usage(
+    cpu_dict_1: Dict[str, Vector], cpu_dict_2: Dict[str, Vector], timestamp: Optional[datetime] = None
+) -> dict:
+    timestamp = timestamp or datetime.now()
+
+    if not cpu_dict_1.keys() == cpu_dict_2.keys():
+        raise ParsingError(f"Got incompatible cpu data: {list(cpu_dict_1)}\n{list(cpu_dict_2)}")
+
+    if "cpu" not in cpu_dict_1:
+        raise ParsingError(f"Raw data incomplete, missing 'cpu' line: {list(cpu_dict_1)}\n{list(cpu_dict_2)}")
+
+    total = None
+    cores = {}
+    for cpu, ticks_1 in cpu_dict_1.items():
+        diffs = cpu_dict_2[cpu] - ticks_1
+        total_ticks = sum(diffs)
+        if cpu == "cpu":
+            if total_ticks <= 0:
+                # E.g. both samples taken back to back, there is no usage to derive (0 idle would read as 100% load)
+                raise ParsingError(f"No cpu time elapsed between samples: {ticks_1}\n{cpu_dict_2[cpu]}")
+            percentages = diffs / total_ticks * 100
+            total = LinuxCpuModeUsageInfo(**dict(zip(_CPU_MODE_LABELS, percentages)))
+        elif total_ticks <= 0:
+            # A single core can miss a tick in a short interval, it just did no work in it
+            cores[cpu.replace("cpu", "")] = 0.0
+        else:
+            # Cores only report their load, so only the idle share is needed (rounded like the model fields are)
+            idle = diffs[_IDLE_INDEX] / total_ticks * 100
+            cores[cpu.replace("cpu", "")] = 100 - round(idle, 3)
 
     cpu_load = {
         "load": 100 - total.idle,
         "mode_usage": total,
-        "cores": {k.replace("cpu", ""): 100 - v.idle for k, v in mode_usages.items()},
+        "cores": cores,
         "timestamp": timestamp,
     }
 
@@ -62,11 +105,7 @@ def parse_proc_stat(raw_cpu_usage_1: str, raw_cpu_usage_2: str, timestamp: Optio
 def parse_proc_meminfo(raw_memory_usage: str, timestamp: Optional[datetime] = None) -> dict:
     """Parse output from '/proc/meminfo'"""
     timestamp = timestamp or datetime.now()
-    mem_dict = {}
-    for line in raw_memory_usage.strip().split("\n"):
-        if len(line.split()) > 1:
-            key, value, *_ = line.split()
-            mem_dict[key.strip(":")] = int(value)
+    mem_dict = {key: int(value) for key, value in _MEMINFO_RE.findall(raw_memory_usage) if key in _MEMINFO_KEYS}
 
     try:
         buff_cache = mem_dict["Cached"] + mem_dict["SReclaimable"] + mem_dict["Buffers"]
@@ -98,7 +137,7 @@ def _parse_delimiter_and_page_size(raw_data: str, separator_pattern: str) -> Tup
     header = raw_data.split("\n", 10)[:10]
     page_size = next((line for line in header if line.isnumeric()), None)
     delimiter = next((line for line in header if separator_pattern in line), None)
-    if page_size is None or delimiter is None:
+    if page_size is None or not delimiter:
         raise ParsingError(
             f"Could not parse page size or separator from header: "
             f"{header}\n page_size: {page_size}, delimiter: {delimiter}"
@@ -107,27 +146,42 @@ def _parse_delimiter_and_page_size(raw_data: str, separator_pattern: str) -> Tup
     return delimiter, page_size
 
 
+def _iter_chunks(raw_data: str, delimiter: str) -> Iterator[str]:
+    # Same chunks as raw_data.split(delimiter)[1:], without materializing the list of every process
+    start = raw_data.find(delimiter)
+    while start != -1:
+        start += len(delimiter)
+        end = raw_data.find(delimiter, start)
+        yield raw_data[start:] if end == -1 else raw_data[start:end]
+        start = end
+
+
 # pylint: disable=R0914(too-many-locals)
 def parse_cpu_usage_from_proc_files(
     raw_cpu_usage_1: str, raw_cpu_usage_2: str, separator_pattern: str, timestamp: datetime = None
 ) -> Dict[Process, dict]:
     timestamp = timestamp or datetime.now()
     delimiter, page_size = _parse_delimiter_and_page_size(raw_cpu_usage_1, separator_pattern)
-    raw_cpu_list_1 = raw_cpu_usage_1.split(f"{delimiter}")[1:]
-    raw_cpu_list_2 = raw_cpu_usage_2.split(f"{delimiter}")[1:]
-    if not raw_cpu_list_1 or not raw_cpu_list_2:
+    if delimiter not in raw_cpu_usage_1 or delimiter not in raw_cpu_usage_2:
         raise ParsingError(
             f"No process data after available in list(s) (delimiter: {delimiter}): {raw_cpu_usage_1}\n{raw_cpu_usage_2}"
         )
-    proc_times_1 = parse_times_from_proc_files(raw_cpu_list_1, page_size)
-    proc_times_2 = parse_times_from_proc_files(raw_cpu_list_2, page_size)
+    # Only the identity and cpu times are needed from the first sample
+    cpu_times_1 = {
+        pid: (name, start_time, command, cpu_time)
+        for pid, name, start_time, command, cpu_time, _ in _iter_proc_stat_entries(
+            _iter_chunks(raw_cpu_usage_1, delimiter)
+        )
+    }
 
-    cpu_pattern = re.compile(r"cpu\s+" + r"\s+".join([r"(\d+)"] * 10))
-    cpu_ticks_1 = match.groups() if (match := re.search(cpu_pattern, raw_cpu_list_1[-1])) is not None else None
-    cpu_ticks_2 = match.groups() if (match := re.search(cpu_pattern, raw_cpu_list_2[-1])) is not None else None
+    # The system wide /proc/stat is the last chunk
+    last_chunk_1 = raw_cpu_usage_1.rpartition(delimiter)[2]
+    last_chunk_2 = raw_cpu_usage_2.rpartition(delimiter)[2]
+    cpu_ticks_1 = match.groups() if (match := _TOTAL_CPU_STAT_RE.search(last_chunk_1)) is not None else None
+    cpu_ticks_2 = match.groups() if (match := _TOTAL_CPU_STAT_RE.search(last_chunk_2)) is not None else None
 
     if not cpu_ticks_1 or not cpu_ticks_2:
-        raise ParsingError(f"Could not find cpu information in statfile {raw_cpu_list_1[-1:]}\n{raw_cpu_list_2[-1:]}")
+        raise ParsingError(f"Could not find cpu information in statfile {last_chunk_1}\n{last_chunk_2}")
     try:
         tick_1 = sum(map(int, cpu_ticks_1))
         tick_2 = sum(map(int, cpu_ticks_2))
@@ -135,15 +189,22 @@ def parse_cpu_usage_from_proc_files(
         raise ParsingError(f"Cpu tick data incomplete: {cpu_ticks_1}\n{cpu_ticks_2}") from e
     tick_delta = tick_2 - tick_1
 
-    result = {
-        process: {
-            "cpu_load": (cpu_load - proc_times_1.get(process, (0,))[0]) / tick_delta * 100,
-            "mem_usage": mem_usage // 1024,
+    page_size = int(page_size)
+    result = {}
+    # Matched on the int pid, Process models are only built for processes present in both samples
+    for pid, name, start_time, command, cpu_time, rss in _iter_proc_stat_entries(
+        _iter_chunks(raw_cpu_usage_2, delimiter)
+    ):
+        previous = cpu_times_1.get(pid)
+        # A differing identity means the pid was reused between the samples
+        if previous is None or previous[:3] != (name, start_time, command):
+            continue
+        process = Process(pid=pid, name=name, start_time=start_time, command=command)
+        result[process] = {
+            "cpu_load": (cpu_time - previous[3]) / tick_delta * 100,
+            "mem_usage": page_size * rss // 1024,
             "timestamp": timestamp,
         }
-        for process, (cpu_load, mem_usage) in proc_times_2.items()
-        if process in proc_times_1
-    }
     return result
 
 
@@ -153,10 +214,9 @@ def parse_mem_usage_from_proc_files(
 ) -> Dict[Process, dict]:
     timestamp = timestamp or datetime.now()
     delimiter, page_size = _parse_delimiter_and_page_size(raw_process_memory_usage, separator_pattern)
-    raw_stat_list = raw_process_memory_usage.split(f"{delimiter}")[1:]
-    if not raw_stat_list:
+    if delimiter not in raw_process_memory_usage:
         raise ParsingError(f"Could not separate processes (delimiter:{delimiter}): {raw_process_memory_usage}")
-    proc_times = parse_times_from_proc_files(raw_stat_list, page_size)
+    proc_times = parse_times_from_proc_files(_iter_chunks(raw_process_memory_usage, delimiter), page_size)
     result = {
         process: {
             "mem_usage": mem_usage // 1024,
@@ -177,30 +237,58 @@ def parse_disk_usage_from_proc_files(
     return parse_io_from_proc_files(raw_stat_list)
 
 
+def _split_proc_stat(proc: str) -> Optional[Tuple[str, str, List[str], str]]:
+    """
+    Splits the output of /proc/<pid>/stat followed by /proc/<pid>/cmdline into pid, name, the 49 numeric fields
+    following the state, and the cmdline. Returns None if the chunk does not contain a stat line.
+    """
+    # Plain split for the regular layout, the regex only handles what doesn't fit it
+    stat_line, newline, rest = proc.lstrip().partition("\n")
+    fields = stat_line.split()
+    if (
+        newline
+        and len(fields) == 52
+        and fields[0].isdecimal()
+        and fields[1].startswith("(")
+        and fields[1].endswith(")")
+        and len(fields[2]) == 1
+    ):
+        return fields[0], fields[1][1:-1], fields[3:], rest.partition("\n")[0]
+    if match := _PROC_STAT_RE.search(proc):
+        groups = match.groups()
+        return groups[0], groups[1], list(groups[2:51]), groups[51]
+    return None
+
+
+def _iter_proc_stat_entries(proc_metrics) -> Iterator[Tuple[int, str, str, str, int, int]]:
+    """Yields pid, name, start time, command, cpu time (utime + stime) and rss (in pages) of each process"""
+    for proc in proc_metrics:
+        if split_stat := _split_proc_stat(proc):
+            pid, name, stat, cmdline = split_stat
+            # The plain split doesn't check that the fields are numeric like the regex does, int() does it here
+            try:
+                int(stat[18])
+                cpu_time = int(stat[10]) + int(stat[11])
+                rss = int(stat[20])
+            except ValueError as e:
+                raise ParsingError(f"Non-numeric field in process stat: {proc}") from e
+            yield int(pid), name, stat[18], cmdline or name, cpu_time, rss
+
+
 def parse_times_from_proc_files(proc_metrics, page_size) -> Dict[Process, int]:
     proc_times = {}
-    regex_components = [r"(?P<pid>\d+)", r"\((?P<name>\S+)\)", r"\S", *([r"(-?\d+)"] * 49)]
-    proc_regex = r"\s+".join(regex_components) + r"\n(?P<cmdline>.*)"
-    for proc in proc_metrics:
-        if match := re.search(proc_regex, proc):
-            proc = Process(
-                pid=int(match.group("pid")),
-                name=match.group("name"),
-                start_time=match.group(21),
-                command=match.group("cmdline") or match.group("name"),
-            )
-            proc_times[proc] = (int(match.group(13)) + int(match.group(14)), int(page_size) * int(match.group(23)))
+    page_size = int(page_size)
+    for pid, name, start_time, command, cpu_time, rss in _iter_proc_stat_entries(proc_metrics):
+        proc = Process(pid=pid, name=name, start_time=start_time, command=command)
+        # utime + stime, rss in bytes
+        proc_times[proc] = (cpu_time, page_size * rss)
     return proc_times
 
 
 def parse_io_from_proc_files(proc_metrics) -> Dict[Process, int]:
     proc_times = {}
-    regex_components = [r"(?P<pid>\d+)", r"\((?P<name>\S+)\)", r"\S", *([r"(-?\d+)"] * 49)]
-    io_regex = r"".join([r"\n(\w+:\s+\d+)"] * 7)
-    proc_regex = r"\s+".join(regex_components) + io_regex + r"\n(?P<cmdline>.*)"
-
     for proc in proc_metrics:
-        if match := re.search(proc_regex, proc):
+        if match := _PROC_IO_RE.search(proc):
             proc = Process(
                 pid=int(match.group("pid")),
                 name=match.group("name"),
@@ -213,34 +301,29 @@ def parse_io_from_proc_files(proc_metrics) -> Dict[Process, int]:
     return proc_times
 
 
+def _systemd_match_to_seconds(match: re.Match) -> float:
+    seconds = float(match["secs"])
+    if mins := match["mins"]:
+        # Convert '1min' to 60 seconds, for example
+        seconds += int(mins) * 60
+    return seconds
+
+
 def parse_systemd_analyze(analyze_string: str) -> dict:
     """Parse the systemd-analyze output into a dictionary with all times in seconds."""
 
-    pattern = r"(\d+min)?\s?(\d+\.\d+)s\s\((.*?)\)"
-    matches = re.findall(pattern, analyze_string)
-
     results: Dict[str, Any] = {"extra": {}}
-    for match in matches:
-        mins, secs, phase = match
-        total_seconds = float(secs)
-        if mins:
-            # Convert '1min' to 60 seconds, for example
-            total_seconds += float(mins[:-3]) * 60
-
-        results["extra"][phase] = total_seconds
+    for match in _SYSTEMD_PHASE_RE.finditer(analyze_string):
+        results["extra"][match["phase"]] = _systemd_match_to_seconds(match)
 
     # Also extract the total and target reached time
-    total_time = re.search(r"=\s(\d+min)?\s?(\d+\.\d+)s", analyze_string)
+    total_time = _SYSTEMD_TOTAL_RE.search(analyze_string)
     if total_time:
-        mins, secs = total_time.groups()
-        total_secs = float(secs)
-        if mins:
-            total_secs += float(mins[:-3]) * 60
-        results["total"] = total_secs
+        results["total"] = _systemd_match_to_seconds(total_time)
     else:
         raise ParsingError(f"Unable to parse total time from systemd-analyze: {analyze_string}")
 
-    target_time = re.search(r"after\s(\d+\.\d+)s", analyze_string)
+    target_time = _SYSTEMD_TARGET_RE.search(analyze_string)
     if target_time:
         results["extra"]["graphical.target"] = float(target_time.group(1))
 
@@ -289,17 +372,14 @@ def parse_df(raw_data: str) -> dict:
 
 def parse_proc_net_dev(proc_net_data: List[str]) -> dict:
     net_dev_info = {}
-    data_pattern = re.compile(r"(\S+):" + r"".join([r"\s+(\d+)"] * 16))
-    time_pattern = re.compile(r"(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}),(\d{6})\d*(\+\d{2}:\d{2})")
-
     receive = ("kibibytes", "packets", "errs", "drop", "fifo", "frame", "compressed", "multicast")
     transmit = ("kibibytes", "packets", "errs", "drop", "fifo", "colls", "carrier", "compressed")
 
     try:
-        match = re.search(time_pattern, proc_net_data)
+        match = _NET_DEV_TIME_RE.search(proc_net_data)
         timestamp_str = f"{match.group(1)}.{match.group(2)}{match.group(3)}"
         sample_time = datetime.fromisoformat(timestamp_str)
-        for matches in re.finditer(data_pattern, proc_net_data):
+        for matches in _NET_DEV_DATA_RE.finditer(proc_net_data):
             iface = matches.group(1).strip()
             receive_data = [int(matches.group(i)) for i in range(2, 10)]
             transmit_data = [int(matches.group(i)) for i in range(10, 18)]
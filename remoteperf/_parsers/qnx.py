@@ -1,10 +1,11 @@
 # Copyright 2024 Volvo Cars
 # SPDX-License-Identifier: Apache-2.0
+import re
 from datetime import datetime
 from pathlib import PurePosixPath
 from typing import Dict, Optional, Tuple
 
-import regex as re
+import regex
 
 from remoteperf._parsers import generic
 from remoteperf._parsers.generic import ParsingError, ParsingInfo
@@ -16,6 +17,26 @@ from remoteperf.models.qnx import (
     QnxPacketData,
 )
 
+_HOGS_CORE_RE = re.compile(r"\s+".join([r"(\d+)", r"\[idle\]", r"\d+", r"\d+%", r"(\d+)%"]))
+# Only fuzzy matching needs the regex module, everything else uses the faster stdlib engine
+_IDLE_FUZZY_RE = regex.compile(r"( \[idle\] ){e<=1}")
+_MEM_PID_RE = re.compile(
+    r"pid=(\d+):.*?\n.*?as_stats\.rss=0x([0-9a-f]+).*?\(([\d.]+)(GB|MB|kB|B|b)?\)",
+    re.IGNORECASE,
+)
+_VM_STAT_RE = re.compile(r"page_count=\S+\s+\(([0-9.]+)([GMKk]B)\).*\n.*pages_free=\S+\s+\(([0-9.]+)([GMKk]B)\)")
+_BOOT_TIME_RE = re.compile(r"(\b\d+s)?(\d+ns\b)")
+_UPTIME_BOOT_RE = re.compile(r"BootTime:(.*?) GMT (\d{4})")
+_NICINFO_INTERFACE_SPLIT_RE = re.compile(r"\n(?=[a-zA-Z]+)")
+_NICINFO_VALUE_SPLIT_RE = re.compile(r"\s+\.+\s+")
+_MONTHS = {
+    month: i
+    for i, month in enumerate(("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"), 1)
+}
+_WEEKDAYS = frozenset(("mon", "tue", "wed", "thu", "fri", "sat", "sun"))
+# Memory units reported by pidin/vm stats, unitless values are bytes
+_UNIT_TO_KB = {"gb": 1024**2, "mb": 1024, "kb": 1, "b": 1 / 1024, "": 1 / 1024}
+
 
 def parse_hogs_cpu_usage(hogs_output: str, timestamp: Optional[datetime] = None) -> dict:
     """
@@ -50,9 +71,7 @@ def parse_hogs_cpu_usage(hogs_output: str, timestamp: Optional[datetime] = None)
 
     :raises ParsingError: If the input string cannot be parsed in the expected format.
     """
-    col_patterns = [r"(\d+)", r"\[idle\]", r"\d+", r"\d+%", r"(\d+)%"]
-    core_pattern = r"\s+".join(col_patterns)
-    matches = re.findall(re.compile(core_pattern), hogs_output)
+    matches = _HOGS_CORE_RE.findall(hogs_output)
     if not matches:
         raise ParsingError("Could not extract any cpu data")
     total_load = round(100 - sum(float(load) for _, load in matches) / len(matches), 2)
@@ -107,24 +126,27 @@ def parse_hogs_pidin_proc_wise(raw_cpu_data: str, timestamp: Optional[datetime]
     timestamp = timestamp or datetime.now()
     parsed_hogs_data = parse_hogs(raw_cpu_data, ("SYS", "PID", "NAME"))
     parsed_pidin_data = parse_pidin(raw_cpu_data, ("pid", "name", "Arguments", "start_time"))
+    n_cpus = len(_IDLE_FUZZY_RE.findall(raw_cpu_data))
 
     result = {}
 
     for pid, process in parsed_pidin_data.items():
         hogs_process = parsed_hogs_data.get(pid)
-        if hogs_process and (hogs_process["NAME"] in process["name"] or hogs_process["NAME"] in process["Arguments"]):
-            p = Process(
-                pid=process["pid"],
-                name=process["name"],
-                command=process["Arguments"],
-                start_time=process["start_time"],
-            )
+        if not hogs_process:
+            continue
+        # Both names are basenames, so equality is the common case and the substring checks only a fallback
+        hogs_name = hogs_process["NAME"]
+        if hogs_name != process["name"] and hogs_name not in process["name"] and hogs_name not in process["Arguments"]:
+            continue
+        p = Process(
+            pid=process["pid"],
+            name=process["name"],
+            command=process["Arguments"],
+            start_time=process["start_time"],
+        )
 
-            cpu_pattern = r" \[idle\] "
-            fuzzy_pattern = rf"({cpu_pattern}){{e<=1}}"
-            n_cpus = len(re.findall(fuzzy_pattern, raw_cpu_data))
-            load = hogs_process["SYS"] / n_cpus
-            result[p] = {"cpu_load": load, "timestamp": timestamp}
+        load = hogs_process["SYS"] / n_cpus
+        result[p] = {"cpu_load": load, "timestamp": timestamp}
 
     return result
 
@@ -217,37 +239,28 @@ def parse_memory_per_pid(raw_data: str) -> dict:
 
     :raises ParsingError: If the input string cannot be parsed in the expected format.
     """
-    pattern = re.compile(
-        r"pid=(\d+):.*?\n.*?as_stats\.rss=0x([0-9a-f]+).*?\(([\d.]+)(GB|MB|kB|B|b)?\)",
-        re.IGNORECASE,
-    )
     pid_memory = {}
 
-    for match in pattern.finditer(raw_data):
+    for match in _MEM_PID_RE.finditer(raw_data):
         pid = int(match.group(1))
-        memory_value = float(match.group(3))
-        unit = match.group(4).lower() if isinstance(match.group(4), str) else ""
-
-        if unit.lower() == "mb":
-            memory_kb = memory_value * 1024
-        elif unit.lower() == "gb":
-            memory_kb = memory_value * 1024**2
-        elif unit.lower() == "kb":
-            memory_kb = memory_value
-        else:
-            memory_kb = memory_value / 1024
-
+        memory_kb = float(match.group(3)) * _UNIT_TO_KB[(match.group(4) or "").lower()]
         pid_memory[pid] = round(memory_kb)
     if not pid_memory:
-        raise ParsingError(f"No matches for pattern: {pattern}")
+        raise ParsingError(f"No matches for pattern: {_MEM_PID_RE}")
 
     return pid_memory
 
 
+def _basename(path: str) -> str:
+    # Called for every process row, so only fall back to PurePosixPath for the "." components it normalizes away
+    name = path.rstrip("/").rpartition("/")[2]
+    return name if name not in ("", ".") else PurePosixPath(path).name
+
+
 def parse_pidin(raw_pidin_data: str, required: Tuple[str]) -> dict:
     categories = {
         "pid": ParsingInfo(r"(\d+)", int, key=1),
-        "name": ParsingInfo(r"([\w/.-]+)", lambda s: PurePosixPath(s).name),
+        "name": ParsingInfo(r"([\w/.-]+)", _basename),
         "sid": ParsingInfo(r"(\d+)", int),
         "start time": ParsingInfo(r"([a-zA-Z]{3}\s+\d+\s+\d{2}:\d{2})", str, rename="start_time"),
         "utime": ParsingInfo(r"([\d.smhd]+)", generic.convert_compact_format_to_seconds),
@@ -262,7 +275,7 @@ def parse_pidin(raw_pidin_data: str, required: Tuple[str]) -> dict:
 def parse_hogs(raw_pidin_data: str, required: Tuple[str]) -> dict:
     categories = {
         "PID": ParsingInfo(r"(\d+)", int, key=1),
-        "NAME": ParsingInfo(r"([\w/.-]+)", lambda s: PurePosixPath(s).name),
+        "NAME": ParsingInfo(r"([\w/.-]+)", _basename),
         "MSEC": ParsingInfo(r"(\d+)", int),
         "PIDS": ParsingInfo(r"(\d*\.?\d+)%", float),
         "SYS": ParsingInfo(r"(\d*\.?\d+)%", float),
@@ -300,12 +313,10 @@ def parse_proc_vm_stat(raw_memory_usage: str, timestamp: Optional[datetime] = No
                  }
     """
     timestamp = timestamp or datetime.now()
-    pattern = r"page_count=\S+\s+\(([0-9.]+)([GMKk]B)\).*\n.*pages_free=\S+\s+\(([0-9.]+)([GMKk]B)\)"
-    match = re.search(pattern, raw_memory_usage)
+    match = _VM_STAT_RE.search(raw_memory_usage)
     if match:
-        conversion = {"GB": 1024**2, "MB": 1024, "KB": 1, "kB": 1}
-        total_kb = float(match.group(1)) * conversion.get(match.group(2))
-        free_kb = float(match.group(3)) * conversion.get(match.group(4))
+        total_kb = float(match.group(1)) * _UNIT_TO_KB[match.group(2).lower()]
+        free_kb = float(match.group(3)) * _UNIT_TO_KB[match.group(4).lower()]
         used_kb = total_kb - free_kb
 
         return {
@@ -313,7 +324,7 @@ def parse_proc_vm_stat(raw_memory_usage: str, timestamp: Optional[datetime] = No
             "timestamp": timestamp,
         }
 
-    raise ParsingError(f"Unable to parse memory, no match found for pattern: {pattern}")
+    raise ParsingError(f"Unable to parse memory, no match found for pattern: {_VM_STAT_RE.pattern}")
 
 
 def parse_bmetrics_boot_time(raw_output: str) -> dict:
@@ -333,8 +344,7 @@ def parse_bmetrics_boot_time(raw_output: str) -> dict:
 
     :raises ParsingError: If the input string cannot be parsed as boot time in the expected format.
     """
-    pattern = r"(\b\d+s)?(\d+ns\b)"
-    match = re.search(pattern, raw_output)
+    match = _BOOT_TIME_RE.search(raw_output)
     if match:
         if match.group(1):
             seconds = int(match.group(1).replace("s", ""))
@@ -343,10 +353,41 @@ def parse_bmetrics_boot_time(raw_output: str) -> dict:
         ns = int(match.group(2).replace("ns", ""))
         boot_time = seconds + (ns / (10**9))
     else:
-        raise ParsingError(f"Unable to extract boot time: no match found for pattern: {pattern}")
+        raise ParsingError(f"Unable to extract boot time: no match found for pattern: {_BOOT_TIME_RE.pattern}")
     return {"total": boot_time}  # type: ignore[call-arg]
 
 
+def _fast_strptime(month: str, day: str, clock: str, year: str) -> Optional[datetime]:
+    # strptime reparses its format on every call, so the regular qnx layout is taken apart by hand instead
+    hour, _, rest = clock.partition(":")
+    minute, _, second = rest.partition(":")
+    if (
+        month.lower() not in _MONTHS
+        or not all(value.isdecimal() and len(value) <= 2 for value in (day, hour, minute, second))
+        or not (year.isdecimal() and len(year) == 4)
+    ):
+        return None
+    try:
+        return datetime(int(year), _MONTHS[month.lower()], int(day), int(hour), int(minute), int(second))
+    except ValueError:
+        return None
+
+
+def _parse_boot_time(boot_time_str: str) -> datetime:
+    parts = boot_time_str.split()
+    if len(parts) == 4 and (parsed := _fast_strptime(*parts)):
+        return parsed
+    return datetime.strptime(boot_time_str, "%b %d %H:%M:%S %Y")
+
+
+def _parse_date(date_str: str) -> datetime:
+    parts = date_str.split()
+    if len(parts) == 6 and parts[0].lower() in _WEEKDAYS and parts[4] in ("GMT", "UTC"):
+        if parsed := _fast_strptime(parts[1], parts[2], parts[3], parts[5]):
+            return parsed
+    return datetime.strptime(date_str, "%a %b %d %H:%M:%S %Z %Y")
+
+
 def parse_uptime(boot_data: str, date_data: str, timestamp: Optional[datetime] = None) -> dict:
     """
     Parses boot and date information to calculate system uptime.
@@ -369,13 +410,12 @@ def parse_uptime(boot_data: str, date_data: str, timestamp: Optional[datetime] =
              {"total": 18629.0, "timestamp": datetime(2024, 10, 14, 10, 37, 54)}
     """
     timestamp = timestamp or datetime.now()
-    boot_time_pattern = r"BootTime:(.*?) GMT (\d{4})"
-    boot_time_match = re.search(boot_time_pattern, boot_data)
+    boot_time_match = _UPTIME_BOOT_RE.search(boot_data)
     if boot_time_match:
         try:
             boot_time_str = boot_time_match.group(1) + " " + boot_time_match.group(2)
-            boot_time = datetime.strptime(boot_time_str, "%b %d %H:%M:%S %Y")
-            current_time = datetime.strptime(date_data.strip(), "%a %b %d %H:%M:%S %Z %Y")
+            boot_time = _parse_boot_time(boot_time_str)
+            current_time = _parse_date(date_data.strip())
             uptime = current_time - boot_time
         except ValueError as e:
             raise ParsingError("Failed to parse datetime data from data") from e
@@ -421,7 +461,7 @@ def parse_nicinfo(nicinfo_output: str) -> dict:
     }
 
     try:
-        nicinfo_interface_list = re.split(r"\n(?=[a-zA-Z]+)", nicinfo_output.strip())
+        nicinfo_interface_list = _NICINFO_INTERFACE_SPLIT_RE.split(nicinfo_output.strip())
 
         # QNX does not provide timestamps via console in the precision we need (only seconds available via date).
         # Therefore we switch to the timestamp of the host system.
@@ -457,7 +497,7 @@ def parse_nicinfo_interface(nicinfo_output: str, receive_names, transmit_names)
     for line in nicinfo_output:
         if not line or "Ethernet Controller" in line:
             continue
-        name_value_split = re.split(r"\s+\.+\s+", line)
+        name_value_split = _NICINFO_VALUE_SPLIT_RE.split(line)
         if len(name_value_split) == 2 and name_value_split[0].strip() in set(receive_names.values()) | set(
             transmit_names.values()
         ):
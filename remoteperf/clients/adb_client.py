@@ -1,15 +1,23 @@
 # Copyright 2024 Volvo Cars
 # SPDX-License-Identifier: Apache-2.0
 import logging
+import shlex
+import socket
 import subprocess
 import time
-from typing import Union, overload
+import uuid
+from typing import Optional, Union, overload
 
-from adbutils import AdbClient, AdbDevice, AdbError, AdbTimeout
+from adbutils import AdbClient, AdbConnection, AdbDevice, AdbError, AdbTimeout
 
 from remoteperf.clients.lock_client import LockClient, LockClientException
 
 
+# Seconds between connection recovery attempts
+_RECOVERY_BACKOFF_MIN = 0.01
+_RECOVERY_BACKOFF_MAX = 0.5
+
+
 class ADBClientException(LockClientException):
     pass
 
@@ -40,6 +48,9 @@ class ADBClient(LockClient):
         self._retries = retries
         self._timeout = timeout
         self._exception = ADBClientException
+        # Long-lived remote shell that commands are written to, saves setting up a shell transport for every command
+        self._shell: Optional[AdbConnection] = None
+        self._shell_supported = True
 
     @property
     def connected(self) -> bool:
@@ -66,8 +77,11 @@ class ADBClient(LockClient):
             self._device.get_state()
         except (AdbError, ConnectionResetError) as e:
             raise ADBClientException(f"Could not connect to device: {e}. Available devices: {device_list}") from e
+        # A new connection gets its own chance at a persistent shell
+        self._shell_supported = True
 
     def _disconnect(self):
+        self._close_shell()
         try:
             self._adb_session.disconnect(addr=self._host)
         except Exception:  # Does not really matter what happens here: pylint: disable=W0718
@@ -82,6 +96,13 @@ class ADBClient(LockClient):
             raise ADBClientException("Cannot run commands: Not connected")
         for attempt in range(1, _retries + 2):
             try:
+                if (shell := self._get_shell()) is not None:
+                    try:
+                        return self._run_in_shell(shell, command, _timeout)
+                    except Exception:
+                        # The shell output can't be trusted to be in sync after a failure, so start over with a new one
+                        self._close_shell()
+                        raise
                 return self._device.shell2(command, timeout=_timeout).output.replace("\x00", "")
             except AdbTimeout as e:
                 if attempt >= _retries:
@@ -102,6 +123,58 @@ class ADBClient(LockClient):
             )
         )
 
+    def _get_shell(self) -> Optional[AdbConnection]:
+        if self._shell is not None and not self._shell.closed:
+            return self._shell
+        if not self._shell_supported:
+            return None
+        try:
+            self._shell = self._device.open_shell("sh")
+            # The shell service is accepted before sh has even started, only a round trip shows that it runs
+            self._run_in_shell(self._shell, "true", self._timeout)
+        except Exception as e:  # Package throws generic errors intermittently, so pylint: disable=W0718
+            self._logger.debug(f"Could not start a persistent shell, using one shell per command (cause: {e})")
+            self._shell_supported = False
+            self._close_shell()
+            return None
+        return self._shell
+
+    def _close_shell(self) -> None:
+        shell, self._shell = self._shell, None
+        if shell is not None:
+            try:
+                shell.close()
+            except Exception:  # Does not really matter what happens here: pylint: disable=W0718
+                pass
+
+    @classmethod
+    def _run_in_shell(cls, shell: AdbConnection, command: str, timeout: float) -> str:
+        # The subshell keeps state (cd, exports...) from leaking between commands, like separate shells would.
+        # The command is passed quoted to eval, so unbalanced quotes or an open heredoc fail on their own instead of
+        # swallowing the marker. Stdin is detached so the command can't consume what is written after it, stderr
+        # is kept since shell2 returned it mixed into the output as well.
+        marker = f"__remoteperf_{uuid.uuid4().hex}__"
+        end = f"\n{marker}\n".encode()
+        shell.send(f"(eval {shlex.quote(command)}) </dev/null 2>&1; printf '\\n%s\\n' {marker}\n".encode())
+        output = bytearray()
+        deadline = time.time() + timeout
+        while (index := output.find(end)) == -1:
+            remaining = deadline - time.time()
+            try:
+                if remaining <= 0:
+                    raise socket.timeout()
+                shell.conn.settimeout(remaining)
+                data = shell.conn.recv(65536)
+            except socket.timeout as e:
+                partial = output.decode("utf-8", errors="replace")
+                raise AdbTimeout(f"Timeout occured reading command output. Partial output: {partial}") from e
+            if not data:
+                partial = output.decode("utf-8", errors="replace")
+                raise ADBClientException(f"Shell closed while reading command output. Partial output: {partial}")
+            output += data
+        del output[index:]
+        return cls._decode_output(output, errors="replace")
+
     def _pull_file(self, path: str, dest: str):
         for _ in range(1, max(self._retries, 0) + 2):
             try:
@@ -128,15 +201,22 @@ class ADBClient(LockClient):
         state = ""
         error = None
         device_list = None
+        backoff = _RECOVERY_BACKOFF_MIN
         t0 = time.time()
         while t0 + self._timeout > time.time():
             try:
                 device_list = self._adb_session.device_list()
                 if any(device.serial == self._device.serial for device in device_list):
                     if (state := self._device.get_state()) == "device":
+                        # The device may have restarted, so the shell is respawned and gets a new chance if it failed
+                        self._close_shell()
+                        self._shell_supported = True
                         return True
             except Exception as e:  # Package throws generic errors intermittently, so pylint: disable=W0718
                 error = e
+            # Back off between attempts rather than spinning on the adb daemon
+            time.sleep(min(backoff, max(t0 + self._timeout - time.time(), 0)))
+            backoff = min(backoff * 2, _RECOVERY_BACKOFF_MAX)
         if device_list is None:
             raise ADBClientException(f"Error: Failed to retrieve device list: {error}") from error
         raise ADBClientException(
@@ -1,7 +1,7 @@
 # Copyright 2024 Volvo Cars
 # SPDX-License-Identifier: Apache-2.0
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import List, Optional, Tuple
 
 
 class BaseClientException(Exception):
@@ -14,6 +14,11 @@ class BaseClient(ABC):
     def connected(self):
         pass
 
+    @property
+    def connection_count(self) -> int:
+        """Number of times the client has connected, anything cached about the target is stale once it changes"""
+        return 0
+
     @abstractmethod
     def __enter__(self) -> "BaseClient":
         pass
@@ -57,6 +62,18 @@ class BaseClient(ABC):
         >>> client.pull_file('/remote/path/to/file', '/local/folder/')
         """
 
+    def pull_files(self, files: List[Tuple[str, str]]) -> None:
+        """
+        Pulls several files from the target system, see pull_file. Clients may transfer them concurrently.
+
+        :param files: (path, dest) pairs, as passed to pull_file.
+
+        :example:
+        >>> client.pull_files([('/remote/path/to/file', '/local/folder/'), ('/remote/other', '/local/folder/')])
+        """
+        for path, dest in files:
+            self.pull_file(path, dest)
+
     @abstractmethod
     def push_file(self, path: str, dest: str) -> None:
         """
@@ -3,11 +3,13 @@
 import logging
 import os
 import pathlib
+import stat
+import weakref
 from abc import abstractmethod
 from datetime import datetime
 from pathlib import Path
 from threading import Lock
-from typing import Optional
+from typing import Dict, List, Optional, TextIO, Tuple
 
 from remoteperf.clients.base_client import BaseClient, BaseClientException
 from remoteperf.utils.fs_utils import RemoteFs
@@ -17,6 +19,19 @@ class LockClientException(BaseClientException):
     pass
 
 
+def _local_stat(path: pathlib.Path) -> Optional[os.stat_result]:
+    # One stat call answers exists/is_dir/is_file, instead of a separate one per pathlib check
+    try:
+        return path.stat()
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+
+
+def _close_files(files: Dict[str, TextIO]) -> None:
+    for file in files.values():
+        file.close()
+
+
 class LockClient(BaseClient):
     """
     Base class for handlers with a global lock on their session
@@ -28,6 +43,12 @@ class LockClient(BaseClient):
         self._fs_utils = RemoteFs(client=self, tmp_directory=None)
         self._exception = LockClientException
         self._cleanup = {}
+        # Command log files stay open until disconnect, keyed on the log_path they were requested with
+        self._log_files: Dict[str, TextIO] = {}
+        self._log_files_lock = Lock()
+        self._connection_count = 0
+        # Closes the log files of clients that are never disconnected, when collected or at the latest on exit
+        weakref.finalize(self, _close_files, self._log_files)
 
     def __enter__(self):
         self.connect()
@@ -39,10 +60,18 @@ class LockClient(BaseClient):
                 self.run_command(f"rm {flags if flags else ''} {path}")
         self.disconnect()
 
+    @property
+    def connection_count(self) -> int:
+        return self._connection_count
+
     def connect(self):
         self._log_lock("connect")
         with self._call_lock:
-            return self._connect()
+            was_connected = self.connected
+            result = self._connect()
+            if not was_connected:
+                self._connection_count += 1
+            return result
 
     def run_command(self, command: str, *, retries=None, timeout=None, log_path: str = None, **kwargs) -> str:
         self._log_lock(f"run_command with command: {command}")
@@ -54,57 +83,66 @@ class LockClient(BaseClient):
 
     def disconnect(self):
         self._log_lock("disconnect")
+        self._close_log_files()
         with self._call_lock:
             return self._disconnect()
 
-    def pull_file(self, path: str, dest: str) -> None:  # noqa: C901
+    def pull_file(self, path: str, dest: str) -> None:
         self._log_lock("pull_file")
+        checked = self._check_pull(path, dest)
+        with self._call_lock:
+            return self._pull_file(*checked)
+
+    def pull_files(self, files: List[Tuple[str, str]]) -> None:
+        self._log_lock("pull_files")
+        # Everything is validated before the first transfer starts
+        checked = [self._check_pull(path, dest) for path, dest in files]
+        with self._call_lock:
+            return self._pull_files(checked)
+
+    def _check_pull(self, path: str, dest: str) -> Tuple[str, str]:  # noqa: C901
         _path = pathlib.Path(path)
         _dest = pathlib.Path(dest)
 
-        if not _dest.is_dir():
+        dest_stat = _local_stat(_dest)
+        if dest_stat is None or not stat.S_ISDIR(dest_stat.st_mode):
             if not _dest.parent.exists():
                 raise self._exception(f"Local directory {_dest.parent} not found")
         else:
-            if not _dest.exists():
-                raise self._exception(f"Local directory '{_dest}' not found")
-            if not _dest.is_dir():
-                raise self._exception(f"Local destination path {_dest} is not a directory")
             _dest = _dest / _path.name
-        if _dest.exists():
+            dest_stat = _local_stat(_dest)
+        if dest_stat is not None:
             if not os.access(str(_dest), os.W_OK):
                 raise self._exception(f"Local file {_dest} found, but permissions are insufficient to override")
 
-        if not self._fs_utils.is_file(path):
-            if self._fs_utils.is_directory(path):
+        remote_info = self._fs_utils.path_info(path)
+        if not remote_info.is_file:
+            if remote_info.is_directory:
                 raise self._exception(f"Remote path {path} is a directory")
             raise self._exception(f"File path {path} not found on remote")
-        if not self._fs_utils.has_read_permissions(path):
+        if not remote_info.readable:
             raise self._exception(f"Canot pull {path}, insufficient permissions")
-
-        with self._call_lock:
-            return self._pull_file(str(_path), str(_dest))
+        return str(_path), str(_dest)
 
     def push_file(self, path: str, dest: str) -> None:  # noqa: C901
         self._log_lock("push_file")
         _path = pathlib.Path(path)
         _dest = pathlib.Path(dest)
 
-        if not self._fs_utils.is_directory(_dest):
+        dest_info = self._fs_utils.path_info(_dest)
+        if not dest_info.is_directory:
             if not self._fs_utils.exists(_dest.parent):
                 raise self._exception(f"Directory {_dest.parent} not found on remote")
         else:
-            if not self._fs_utils.exists(_dest):
-                raise self._exception(f"Directory '{_dest}' not found on remote")
-            if not self._fs_utils.is_directory(_dest):
-                raise self._exception(f"Remote destination path {_dest} is not a directory")
             _dest = _dest / _path.name
-        if self._fs_utils.exists(_dest):
-            if not self._fs_utils.has_write_permissions(_dest):
+            dest_info = self._fs_utils.path_info(_dest)
+        if dest_info.exists:
+            if not dest_info.writable:
                 raise self._exception(f"Remote file {_dest} found, but permissions are insufficient to override")
 
-        if not _path.is_file():
-            if _path.is_dir():
+        path_stat = _local_stat(_path)
+        if path_stat is None or not stat.S_ISREG(path_stat.st_mode):
+            if path_stat is not None and stat.S_ISDIR(path_stat.st_mode):
                 raise self._exception(f"Local path {path} is a directory")
             raise self._exception(f"Local file {path} not found.")
         if not os.access(str(_path), os.R_OK):
@@ -123,6 +161,10 @@ class LockClient(BaseClient):
     def _pull_file(self, path: str, dest: str):
         pass
 
+    def _pull_files(self, files: List[Tuple[str, str]]):
+        for path, dest in files:
+            self._pull_file(path, dest)
+
     @abstractmethod
     def _push_file(self, path: str, dest: str):
         pass
@@ -140,13 +182,29 @@ class LockClient(BaseClient):
             self._logger.debug(f"{source} called when lock was already acquired")
 
     @staticmethod
-    def _log_command(command, result, dest: str):
-        dest = Path(dest)
-        if dest.is_dir():
-            dest = dest / "command_log"
-        else:
-            dest.parent.mkdir(parents=True, exist_ok=True)
-        with open(dest, "a", encoding="utf-8") as log_file:
-            log_file.write(f"Command: {command}\n")
-            log_file.write(f"Timestamp: {datetime.now().timestamp()}\n")
-            log_file.write(f"{result}\n")
+    def _decode_output(output: bytearray, errors: str = "strict") -> str:
+        # NUL bytes (e.g. from /proc/*/cmdline) are dropped from the bytes before decoding, and only when there are
+        # any, so that the output isn't copied once more as text afterwards
+        if b"\x00" in output:
+            output = output.translate(None, b"\x00")
+        return output.decode("utf-8", errors=errors)
+
+    def _log_command(self, command, result, dest: str):
+        with self._log_files_lock:
+            if (log_file := self._log_files.get(str(dest))) is None:
+                path = Path(dest)
+                if path.is_dir():
+                    path = path / "command_log"
+                else:
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                log_file = self._log_files[str(dest)] = open(path, "a", encoding="utf-8")  # pylint: disable=R1732
+            log_file.write(f"Command: {command}\nTimestamp: {datetime.now().timestamp()}\n{result}\n")
+            # Flushed per command, so that the log is complete on disk while the session is still running
+            log_file.flush()
+
+    def _close_log_files(self):
+        # The dict is emptied in place, it is the one the finalizer closes
+        with self._log_files_lock:
+            log_files = dict(self._log_files)
+            self._log_files.clear()
+        _close_files(log_files)
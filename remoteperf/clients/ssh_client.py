@@ -1,15 +1,25 @@
 # Copyright 2024 Volvo Cars
 # SPDX-License-Identifier: Apache-2.0
 import logging
+import select
+import shlex
+import socket
 import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
-from typing import Any, Generator
+from typing import Any, Generator, List, Optional, Tuple
 
 import paramiko
 
 from remoteperf.clients.lock_client import LockClient, LockClientException
 
 
+_SFTP_WINDOW_SIZE = 2**24
+# Concurrent sftp channels used when pulling several files
+_SFTP_PULL_WORKERS = 4
+
+
 class SSHClientException(LockClientException):
     pass
 
@@ -40,6 +50,11 @@ class SSHClient(LockClient):
         self._timeout = timeout
         self._exception = SSHClientException
         self._host_key_policy = host_key_policy or paramiko.AutoAddPolicy
+        # Long-lived remote shell that commands are written to, saves opening a channel for every command
+        self._shell: Optional[paramiko.Channel] = None
+        self._shell_supported = True
+        # Sftp session shared by file transfers, saves the subsystem handshake on every pull/push
+        self._sftp: Optional[paramiko.SFTPClient] = None
 
     @property
     def connected(self):
@@ -67,6 +82,8 @@ class SSHClient(LockClient):
             message = f"Could not establish SSH connection: {e}"
             raise SSHClientException(message) from e
         self._client = client
+        # A new connection (possibly to a new host after recovery) gets its own chance at a persistent shell
+        self._shell_supported = True
         self._logger.debug("Connected to the server successfully.")
 
     @property
@@ -88,6 +105,8 @@ class SSHClient(LockClient):
     def _disconnect(self) -> None:
         if not self._client:
             raise SSHClientException("You cannot close a connection that does not exist")
+        self._close_shell()
+        self._close_sftp()
         try:
             self._client.close()
         finally:
@@ -106,15 +125,73 @@ class SSHClient(LockClient):
                 else:
                     self._logger.error(f"Error occured, retrying {attempt}, (cause: {error}).")
             try:
+                if (shell := self._get_shell()) is not None:
+                    return self._run_in_shell(shell, command, _timeout)
                 with self._create_session() as session:
                     session.exec_command(command)
-                    output: str = self._read_and_wait_for_exit_status(session, _timeout)
-                    return output.replace("\x00", "")
+                    return self._read_and_wait_for_exit_status(session, _timeout)
             except Exception as e:  # Cannot guarantee paramiko errors exclusively: pylint: disable=W0718
                 error = e
+                # The shell output can't be trusted to be in sync after a failure, so start over with a new one
+                self._close_shell()
                 self._recover_connection()
         raise SSHClientException(f"Timeout exceeded when reading output after {_retries+1} attempts") from error
 
+    def _get_shell(self) -> Optional[paramiko.Channel]:
+        if self._shell is not None and not self._shell.closed:
+            return self._shell
+        if not self._shell_supported:
+            return None
+        try:
+            self._shell = self._client.get_transport().open_session()
+            # The user's login shell, which is what exec_command runs single commands with as well
+            self._shell.exec_command('exec "${SHELL:-sh}"')
+            # The exec request is accepted before sh has even started, only a round trip shows that it runs
+            self._run_in_shell(self._shell, "true", self._timeout)
+        except Exception as e:  # Cannot guarantee paramiko errors exclusively: pylint: disable=W0718
+            self._logger.debug(f"Could not start a persistent shell, using one session per command (cause: {e})")
+            self._shell_supported = False
+            self._close_shell()
+            return None
+        return self._shell
+
+    def _close_shell(self) -> None:
+        shell, self._shell = self._shell, None
+        if shell is not None:
+            try:
+                shell.close()
+            except Exception:  # Cannot guarantee paramiko errors exclusively: pylint: disable=W0718
+                pass
+
+    @classmethod
+    def _run_in_shell(cls, shell: paramiko.Channel, command: str, timeout: float) -> str:
+        # The subshell keeps state (cd, exports...) from leaking between commands, like separate sessions would.
+        # The command is passed quoted to eval, so unbalanced quotes or an open heredoc fail on their own instead of
+        # swallowing the marker. Stdin is detached so the command can't consume what is written after it, and
+        # stderr is discarded since it was never read from the separate sessions either.
+        marker = f"__remoteperf_{uuid.uuid4().hex}__"
+        end = f"\n{marker}\n".encode()
+        script = f"(eval {shlex.quote(command)}) </dev/null 2>/dev/null; printf '\\n%s\\n' {marker}\n"
+        shell.sendall(script.encode())
+        output = bytearray()
+        deadline = time.time() + timeout
+        while (index := output.find(end)) == -1:
+            remaining = deadline - time.time()
+            try:
+                if remaining <= 0:
+                    raise socket.timeout()
+                shell.settimeout(remaining)
+                data = shell.recv(65536)
+            except socket.timeout as e:
+                partial = output.decode("utf-8", errors="replace")
+                raise TimeoutError(f"Timeout occured reading command output. Partial output:{partial}") from e
+            if not data:
+                partial = output.decode("utf-8", errors="replace")
+                raise SSHClientException(f"Shell closed while reading command output. Partial output: {partial}")
+            output += data
+        del output[index:]
+        return cls._decode_output(output)
+
     @contextmanager
     def _create_session(self) -> Generator[paramiko.Channel, Any, Any]:
         transport = self._client.get_transport()
@@ -126,52 +203,108 @@ class SSHClient(LockClient):
 
     def _read_and_wait_for_exit_status(self, session: paramiko.Channel, timeout):
         t0 = time.time()
-        output = ""
+        # Collected as bytes and decoded once, which also keeps multi-byte characters split between reads intact
+        output = bytearray()
         while time.time() < t0 + timeout:
-            output += self._recv_all(session)
-            session.status_event.wait(timeout / 10)
+            self._recv_all(session, output)
+            if not session.eof_received:
+                # Wakes up as soon as more output (or EOF) arrives, instead of leaving it buffered for a full wait
+                select.select([session], [], [], timeout / 10)
+            else:
+                session.status_event.wait(timeout / 10)
             if session.exit_status_ready():
-                output += self._recv_all(session)
+                self._recv_all(session, output)
                 if (
                     not session.exit_status_ready()
                     or not self._transport_alive(session.get_transport())
                     or not session.active
                 ):
-                    raise SSHClientException(f"Error occured after final read. Partial output: {output}")
-                return output
-        raise TimeoutError(f"Timeout occured reading exit status. Partial output:{output}")
+                    partial = output.decode("utf-8", errors="replace")
+                    raise SSHClientException(f"Error occured after final read. Partial output: {partial}")
+                return self._decode_output(output)
+        partial = output.decode("utf-8", errors="replace")
+        raise TimeoutError(f"Timeout occured reading exit status. Partial output:{partial}")
 
-    def _recv_all(self, session: paramiko.Channel) -> str:
-        out = ""
+    def _recv_all(self, session: paramiko.Channel, output: bytearray) -> None:
         while session.recv_ready():
-            out += session.recv(65536).decode("utf-8")
-            # We send a keep-alive message to prevent race conditions
+            while session.recv_ready():
+                output += session.recv(65536)
+            # We send a keep-alive message to prevent race conditions, once the buffer is drained rather than per chunk
             session.get_transport().global_request("keepalive@volvocars.com", wait=True)
-        return out
+
+    def _get_sftp(self) -> paramiko.SFTPClient:
+        if self._sftp is None or self._sftp.sock.closed:
+            self._sftp = self._open_sftp()
+        return self._sftp
+
+    def _open_sftp(self) -> paramiko.SFTPClient:
+        # get() already pipelines its reads (prefetch), a larger window lets more of them be in flight at once
+        return paramiko.SFTPClient.from_transport(self._client.get_transport(), window_size=_SFTP_WINDOW_SIZE)
+
+    def _close_sftp(self) -> None:
+        sftp, self._sftp = self._sftp, None
+        if sftp is not None:
+            try:
+                sftp.close()
+            except Exception:  # Cannot guarantee paramiko errors exclusively: pylint: disable=W0718
+                pass
 
     def _pull_file(self, path: str, dest: str) -> None:
         error = None
         for attempt in range(1, max(self._retries, 0) + 2):
             try:
-                with self._client.open_sftp() as sftp:
-                    return sftp.get(path, dest)
+                return self._get_sftp().get(path, dest)
             except IOError as e:
                 raise SSHClientException(f"Pulled file did not match remote: {e}") from e
             except Exception as e:  # Cannot guarantee paramiko errors exclusively: pylint: disable=W0718
                 error = e
+                self._close_sftp()
                 self._recover_connection()
         raise SSHClientException(f"Failed to pull file: ({error}) after {attempt} attempt(s)") from error
 
+    def _pull_files(self, files: List[Tuple[str, str]]) -> None:
+        if len(files) < 2:
+            return super()._pull_files(files)
+        # Each worker pulls its share of the files over its own sftp channel, so the transfers run side by side
+        workers = min(_SFTP_PULL_WORKERS, len(files))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(self._pull_file_group, files[i::workers]) for i in range(workers)]
+            unfinished = [pair for future in futures for pair in future.result()]
+        # Left to the regular path, one file at a time, only once no worker uses the connection anymore since it
+        # retries by recovering (reconnecting) the shared transport
+        return super()._pull_files(unfinished)
+
+    def _pull_file_group(self, files: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+        """Pulls the files over a new sftp channel, returns the ones that could not be pulled that way"""
+        try:
+            sftp = self._open_sftp()
+        except Exception:  # Cannot guarantee paramiko errors exclusively: pylint: disable=W0718
+            return files
+        try:
+            for index, (path, dest) in enumerate(files):
+                try:
+                    sftp.get(path, dest)
+                except IOError as e:
+                    raise SSHClientException(f"Pulled file did not match remote: {e}") from e
+                except Exception:  # Cannot guarantee paramiko errors exclusively: pylint: disable=W0718
+                    return files[index:]
+        finally:
+            try:
+                sftp.close()
+            except Exception:  # Cannot guarantee paramiko errors exclusively: pylint: disable=W0718
+                pass
+        return []
+
     def _push_file(self, path: str, dest: str) -> None:
         error = None
         for attempt in range(1, max(self._retries, 0) + 2):
             try:
-                with self._client.open_sftp() as sftp:
-                    return sftp.put(path, dest, confirm=True)
+                return self._get_sftp().put(path, dest, confirm=True)
             except IOError as e:
                 raise SSHClientException(f"Pulled file did not match remote: {e}") from e
             except Exception as e:  # Cannot guarantee paramiko errors exclusively: pylint: disable=W0718
                 error = e
+                self._close_sftp()
                 self._recover_connection()
         raise SSHClientException(f"Failed to pull file: ({error}) after {attempt} attempt(s)") from error
 
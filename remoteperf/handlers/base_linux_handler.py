@@ -1,7 +1,9 @@
 # Copyright 2024 Volvo Cars
 # SPDX-License-Identifier: Apache-2.0
 import time
+from array import array
 from contextlib import contextmanager
+from datetime import datetime
 from typing import Dict, List, Tuple
 
 from remoteperf._parsers import linux as linux_parsers
@@ -37,6 +39,13 @@ from remoteperf.models.super import (
 from remoteperf.utils import _dict_utils as dict_utils
 
 
+# Longest interval (in seconds) slept on the target within a single command, so it stays well within client timeouts
+_MAX_REMOTE_SLEEP = 1.0
+# /proc/stat counts in USER_HZ ticks, which is 100 per second on all common targets
+_CLOCK_TICK = 0.01
+_MAX_TICK_RESAMPLES = 10
+
+
 class BaseLinuxHandlerException(PosixHandlerException):
     pass
 
@@ -56,12 +65,30 @@ class BaseLinuxHandler(PosixImplementationHandler):  # pylint: disable=R0904 (to
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._nonexistant_separator_file = "e39f7761903b"
+        self._remote_fractional_sleep = True
 
     def get_cpu_usage(self, interval: float = 0.3) -> LinuxCpuUsageInfo:
+        if 0 < interval <= _MAX_REMOTE_SLEEP and (self._remote_fractional_sleep or float(interval).is_integer()):
+            # Both samples in one round trip, which also times the interval on the target itself
+            cpu_sample_1, _, cpu_sample_2 = self._cpu_measurement_pair(interval).partition(
+                self._nonexistant_separator_file
+            )
+            if "cpu" in cpu_sample_2:
+                with _handle_parsing_error(cpu_sample_1, cpu_sample_2):
+                    return LinuxCpuUsageInfo(**linux_parsers.parse_proc_stat(cpu_sample_1, cpu_sample_2))
+            # The target rejected the sleep (fractional sleeps are not POSIX, e.g. busybox), so time it locally
+            self._remote_fractional_sleep = False
         timestamp = time.time()
         cpu_sample_1 = self._cpu_measurement()
         time.sleep(max(timestamp + interval - time.time(), 0))
         cpu_sample_2 = self._cpu_measurement()
+        # A window shorter than a clock tick (e.g. interval=0) has no cpu time to measure yet, so resample until one
+        # passed. The aggregate cpu line comes first, it only stays the same while no tick did.
+        for _ in range(_MAX_TICK_RESAMPLES):
+            if cpu_sample_2.partition("\n")[0] != cpu_sample_1.partition("\n")[0]:
+                break
+            time.sleep(_CLOCK_TICK)
+            cpu_sample_2 = self._cpu_measurement()
         with _handle_parsing_error(cpu_sample_1, cpu_sample_2):
             return LinuxCpuUsageInfo(**linux_parsers.parse_proc_stat(cpu_sample_1, cpu_sample_2))
 
@@ -135,10 +162,12 @@ class BaseLinuxHandler(PosixImplementationHandler):  # pylint: disable=R0904 (to
         if len(results) < 2:
             results.append(Sample(data=self._cpu_measurement()))
         parsed_results = []
-        for s1, s2 in zip(results, results[1:]):
+        # Every sample ends one window and starts the next, so tokenize each of them only once
+        ticks = [linux_parsers.parse_proc_stat_raw(sample.data) for sample in results]
+        for (s1, ticks_1), (s2, ticks_2) in zip(zip(results, ticks), zip(results[1:], ticks[1:])):
             with _handle_parsing_error(s1, s2):
                 parsed_results.append(
-                    LinuxCpuUsageInfo(**linux_parsers.parse_proc_stat(s1.data, s2.data, timestamp=s2.timestamp))
+                    LinuxCpuUsageInfo(**linux_parsers.ticks_to_usage(ticks_1, ticks_2, timestamp=s2.timestamp))
                 )
         return CpuList(parsed_results)
 
@@ -217,7 +246,16 @@ class BaseLinuxHandler(PosixImplementationHandler):  # pylint: disable=R0904 (to
 
     def stop_cpu_measurement_proc_wise(self) -> ProcessResourceList:
         _, results = self._stop_measurement(self._cpu_measurement_proc_wise)
-        lst = [ResourceSampleProcessInfo(**p.model_dump(), samples=samples) for p, samples in results.items()]
+        lst = [
+            ResourceSampleProcessInfo(
+                **p.model_dump(),
+                samples=[
+                    LinuxResourceSample(cpu_load=cpu_load, mem_usage=mem_usage, timestamp=timestamp)
+                    for cpu_load, mem_usage, timestamp in zip(*columns)
+                ],
+            )
+            for p, columns in results.items()
+        ]
         output = ProcessResourceList(lst)
         return output
 
@@ -236,8 +274,10 @@ class BaseLinuxHandler(PosixImplementationHandler):  # pylint: disable=R0904 (to
         return output
 
     def _process_cpu_measurements(
-        self, results: List[Sample], processed_results: Dict[Process, List[tuple]]
-    ) -> Tuple[List[Sample], Dict[Process, List[tuple]]]:
+        self, results: List[Sample], processed_results: Dict[Process, Tuple[array, array, List[datetime]]]
+    ) -> Tuple[List[Sample], Dict[Process, Tuple[array, array, List[datetime]]]]:
+        # Samples are kept as (cpu_load, mem_usage, timestamp) columns per process during the measurement, the
+        # models are only built once it is stopped
         processed_results = processed_results or {}
         if len(results) < 2:
             return results, processed_results
@@ -245,7 +285,11 @@ class BaseLinuxHandler(PosixImplementationHandler):  # pylint: disable=R0904 (to
             for p, sample in linux_parsers.parse_cpu_usage_from_proc_files(
                 results[0].data, results[1].data, self._nonexistant_separator_file, timestamp=results[1].timestamp
             ).items():
-                processed_results.setdefault(p, []).append(LinuxResourceSample(**sample))
+                if (columns := processed_results.get(p)) is None:
+                    columns = processed_results[p] = (array("d"), array("q"), [])
+                columns[0].append(sample["cpu_load"])
+                columns[1].append(sample["mem_usage"])
+                columns[2].append(sample["timestamp"])
         return results[-1:], processed_results
 
     def _process_mem_measurements(
@@ -273,26 +317,37 @@ class BaseLinuxHandler(PosixImplementationHandler):  # pylint: disable=R0904 (to
         return [], processed_results
 
     def _cpu_measurement(self, **_):
-        command = "cat /proc/stat | grep cpu"
-        return self._client.run_command(command.strip())
+        return self._client.run_command("grep ^cpu /proc/stat")
+
+    def _cpu_measurement_pair(self, interval: float) -> str:
+        # The second sample is only taken if the sleep succeeded
+        duration = int(interval) if float(interval).is_integer() else round(interval, 3)
+        command = (
+            f"grep ^cpu /proc/stat; echo {self._nonexistant_separator_file}; "
+            f"sleep {duration} 2>/dev/null && grep ^cpu /proc/stat"
+        )
+        return self._client.run_command(command)
 
     def _resource_measurement_proc_wise(self, **_) -> Tuple[str, str]:
         # We need a seprator here since the cmdline file has no line ending
         # Turns out an error message is a valid separator so we use that ¯\_(ツ)_/¯
-        command = (
-            r'getconf PAGESIZE && /bin/cat $(ls /proc | grep "[0-9]" | '
-            r'sed "s:\([0-9]*\):' + self._nonexistant_separator_file + r" /proc/\1/stat "
-            r'/proc/\1/cmdline:") ' + self._nonexistant_separator_file + r" /proc/stat 2>&1"
+        return self._client.run_command(
+            "getconf PAGESIZE && " + self._cat_proc_files("stat", "cmdline", trailing_files=("/proc/stat",))
         )
-        return self._client.run_command(command)
 
     def _io_measurement_proc_wise(self, **_) -> Tuple[str, str]:
-        command = (
-            r'/bin/cat $(ls /proc | grep "[0-9]" | '
-            r'sed "s:\([0-9]*\):' + self._nonexistant_separator_file + r" /proc/\1/stat "
-            r'/proc/\1/io /proc/\1/cmdline:") ' + self._nonexistant_separator_file + r" 2>&1"
+        return self._client.run_command(self._cat_proc_files("stat", "io", "cmdline"))
+
+    def _cat_proc_files(self, *pid_files: str, trailing_files: Tuple[str, ...] = ()) -> str:
+        # The pid dirs come from a glob (no ls/grep) and xargs splits the file list over as many cat calls as needed,
+        # so the command line can't outgrow ARG_MAX on targets with many processes
+        separator = self._nonexistant_separator_file
+        per_pid = " ".join(f"&/{pid_file}" for pid_file in pid_files)
+        trailing = " ".join((separator, *trailing_files))
+        return (
+            f'{{ printf "%s\\n" /proc/[0-9]* | sed "s:.*:{separator} {per_pid}:"; '
+            f"echo {trailing}; }} | xargs /bin/cat 2>&1"
         )
-        return self._client.run_command(command)
 
     def _cpu_measurement_proc_wise(self, *args, **kwargs) -> str:
         return self._resource_measurement_proc_wise(*args, **kwargs)
@@ -31,6 +31,8 @@ class PosixImplementationHandler(BaseHandler):
         self._log_path.mkdir(parents=True, exist_ok=True)
         self._threads: dict = {}
         self._results: dict = {}
+        self._capabilities: dict = {}
+        self._capabilities_connection = client.connection_count
         self._tmp_directory = tmp_directory
         self.fs_utils = RemoteFs(client=client, tmp_directory=self._tmp_directory)
 
@@ -54,7 +56,16 @@ class PosixImplementationHandler(BaseHandler):
         pass
 
     def _has_capability(self, command: str):
-        return self._client.run_command(f"command -v {command}")
+        # Only found commands are remembered, a missing one is checked again in case it has been installed since.
+        # A reconnect may be to a different (or reflashed) target, so nothing is remembered across one.
+        if (connection := self._client.connection_count) != self._capabilities_connection:
+            self._capabilities.clear()
+            self._capabilities_connection = connection
+        if command not in self._capabilities:
+            if not (output := self._client.run_command(f"command -v {command}")):
+                return output
+            self._capabilities[command] = output
+        return self._capabilities[command]
 
     # pylint: disable=R0917
     def __sample(self, results, processed_results, take_measurement_function, interval, processing_function, **kwargs):
@@ -1,8 +1,10 @@
 # Copyright 2024 Volvo Cars
 # SPDX-License-Identifier: Apache-2.0
 import json
+import operator
 import re
 from datetime import datetime
+from functools import lru_cache
 from typing import (
     Any,
     Dict,
@@ -23,16 +25,34 @@ from typeguard import TypeCheckError, check_type
 
 from remoteperf.utils.attrs_util import attrs_init_replacement, converter
 
+try:
+    from yaml import CSafeDumper as _SafeDumper
+except ImportError:  # libyaml not available
+    from yaml import SafeDumper as _SafeDumper  # type: ignore[assignment]
+
 
 class BaseRemoteperfModelException(Exception):
     pass
 
 
+@lru_cache(maxsize=256)
+def _jsonpath_parts(jsonpath: str) -> tuple:
+    # Split once per path rather than once per model during a sort, list indices are converted to int up front
+    parts = re.split(r"\.|\[|\]", jsonpath)
+    return tuple(int(part) if part.isdigit() else part for part in parts if part)  # Remove empty strings from splitting
+
+
+@lru_cache(maxsize=None)
+def _type_hints(cls) -> Dict[str, Any]:
+    # Resolving annotations walks the whole MRO, so only do it once per model class
+    return get_type_hints(cls)
+
+
 @attrs_init_replacement
 @attr.s(auto_attribs=True, kw_only=True)
 class BaseRemoteperfModel:
     def __new__(cls, **kwargs):
-        expected_types = get_type_hints(cls)
+        expected_types = _type_hints(cls)
         for key, value in kwargs.items():
             try:
                 check_type(value, expected_types.get(key, Any))
@@ -43,7 +63,7 @@ class BaseRemoteperfModel:
 
     @property
     def yaml(self):
-        return yaml.safe_dump(self.model_dump())
+        return yaml.dump(self.model_dump(), Dumper=_SafeDumper, default_flow_style=False)
 
     @property
     def json(self):
@@ -91,45 +111,79 @@ class ArithmeticBaseModel(BaseRemoteperfModel):
     def __add__(self, other):
         if isinstance(other, self.__class__):
             return self.__class__(
-                **self._recursive_op(
-                    self.model_dump(exclude="timestamp"),
-                    other.model_dump(exclude="timestamp"),
+                **self._recursive_op_dict(
+                    self.model_dump(exclude={"timestamp"}),
+                    other.model_dump(exclude={"timestamp"}),
                     lambda a, b: a + b,
                 )
             )
         raise TypeError(f"Unsupported operand type(s) for +: '{type(self).__name__}' and '{type(other).__name__}'")
 
+    @staticmethod
+    def _sum_models(models: List["ArithmeticBaseModel"]) -> "ArithmeticBaseModel":
+        # Same as sum(models[1:], models[0]), but accumulates the dumped values and only builds the resulting model once
+        first = models[0]
+        total = first.model_dump(exclude={"timestamp"})
+        for index in range(1, len(models)):
+            other = models[index]
+            if not isinstance(other, first.__class__):
+                raise TypeError(
+                    f"Unsupported operand type(s) for +: '{type(first).__name__}' and '{type(other).__name__}'"
+                )
+            total = first._recursive_op_dict(total, other.model_dump(exclude={"timestamp"}), operator.add)
+        return first.__class__(**total)
+
     def __div__(self, denominator):
         if isinstance(denominator, (float, int)):
             return self.__class__(
-                **self._recursive_op(
-                    self.model_dump(exclude="timestamp"),
+                **self._recursive_op_scalar(
+                    self.model_dump(exclude={"timestamp"}),
                     denominator,
                     lambda a, b: a / b,
                 )
             )
         raise TypeError(f"Unsupported operand type(s) for /: 'MemoryInfo' and '{type(denominator).__name__}'")
 
+    # Dumped models only contain builtin types, so exact type checks are used instead of isinstance. bool is an
+    # int subclass and is accepted like one, as isinstance did.
     @classmethod
-    def _recursive_op(cls, dict1, other, operation):
+    def _recursive_op_dict(cls, dict1, dict2, operation):
         result = {}
         for key, value in dict1.items():
-            operand = other
-            if isinstance(other, dict):
-                if key in other:
-                    operand = other[key]
-                else:
-                    raise KeyError(f"Key '{key}' not found in both dictionaries.")
-            if isinstance(value, dict):
-                result[key] = cls._recursive_op(value, operand, operation)
-            elif isinstance(value, int) and isinstance(operand, (int, float)):
+            if key not in dict2:
+                raise KeyError(f"Key '{key}' not found in both dictionaries.")
+            operand = dict2[key]
+            value_type = type(value)
+            operand_type = type(operand)
+            if value_type is dict and operand_type is dict:
+                result[key] = cls._recursive_op_dict(value, operand, operation)
+            elif value is None:
+                result[key] = None
+            elif operand_type is not int and operand_type is not float and operand_type is not bool:
+                raise TypeError(f"Unsupported value types for key '{key}': {value_type} and {operand_type}")
+            elif value_type is int or value_type is bool:
                 result[key] = int(operation(value, operand))
-            elif isinstance(value, float) and isinstance(operand, (int, float)):
+            elif value_type is float:
                 result[key] = operation(value, operand)
+            else:
+                raise TypeError(f"Unsupported value types for key '{key}': {value_type} and {operand_type}")
+        return result
+
+    @classmethod
+    def _recursive_op_scalar(cls, dict1, scalar, operation):
+        result = {}
+        for key, value in dict1.items():
+            value_type = type(value)
+            if value_type is dict:
+                result[key] = cls._recursive_op_scalar(value, scalar, operation)
+            elif value_type is int or value_type is bool:
+                result[key] = int(operation(value, scalar))
+            elif value_type is float:
+                result[key] = operation(value, scalar)
             elif value is None:
                 result[key] = None
             else:
-                raise TypeError(f"Unsupported value types for key '{key}': {type(value)} and {type(operand)}")
+                raise TypeError(f"Unsupported value types for key '{key}': {value_type} and {type(scalar)}")
         return result
 
     __floordiv__ = __div__
@@ -321,7 +375,7 @@ class LinuxNetworkInterfaceDeltaSampleList(BaseNetworkInterfaceDeltaSampleList):
 
 
 @attrs_init_replacement
-@attr.s(auto_attribs=True, kw_only=True)
+@attr.s(auto_attribs=True, kw_only=True, eq=False)
 class DiskInfo(BaseInfoModel):
     filesystem: str
     size: int
@@ -330,6 +384,19 @@ class DiskInfo(BaseInfoModel):
     used_percent: int
     mounted_on: str
 
+    def __eq__(self, other):
+        # Disk info is compared by what it describes, not by when it was sampled
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (self.filesystem, self.size, self.used, self.available, self.used_percent, self.mounted_on) == (
+            other.filesystem,
+            other.size,
+            other.used,
+            other.available,
+            other.used_percent,
+            other.mounted_on,
+        )
+
 
 @attrs_init_replacement
 @attr.s(auto_attribs=True, kw_only=True)
@@ -365,10 +432,16 @@ class BaseProcess(BaseRemoteperfModel):
 
 
 @attrs_init_replacement
-@attr.s(auto_attribs=True, kw_only=True, hash=False)
+@attr.s(auto_attribs=True, kw_only=True, hash=False, frozen=True)
 class Process(BaseProcess):
     def __hash__(self):
-        return hash((self.pid, self.name, self.command, self.start_time))
+        # Processes are used as dict keys on every parsed sample, frozen so the hash can be computed once
+        try:
+            return self.__dict__["_hash"]
+        except KeyError:
+            value = hash((self.pid, self.name, self.command, self.start_time))
+            object.__setattr__(self, "_hash", value)
+            return value
 
 
 @attrs_init_replacement
@@ -381,7 +454,7 @@ class BaseInterface(BaseRemoteperfModel):
 @attr.s(auto_attribs=True, kw_only=True, hash=False)
 class Interface(BaseInterface):
     def __hash__(self):
-        return hash((self.name))
+        return hash((self.name,))
 
 
 @attrs_init_replacement
@@ -463,7 +536,7 @@ class ModelList(Generic[ModelT]):
 
     @property
     def yaml(self):
-        return yaml.safe_dump(self.model_dump())
+        return yaml.dump(self.model_dump(), Dumper=_SafeDumper, default_flow_style=False)
 
     def filter(self, fun: callable):
         return self.__class__(item for item in self._list if fun(item))
@@ -474,11 +547,9 @@ class ModelList(Generic[ModelT]):
         Supports dot notation for attributes and dict keys,
         and list indexing with numbers.
         """
-        parts = re.split(r"\.|\[|\]", jsonpath)
-        parts = [part for part in parts if part]  # Remove empty strings from splitting
-        for part in parts:
-            if part.isdigit():  # Handle list indexing
-                obj = obj[int(part)]
+        for part in _jsonpath_parts(jsonpath):
+            if isinstance(part, int):  # Handle list indexing
+                obj = obj[part]
             else:
                 obj = getattr(obj, part, None)
                 if obj is None:
@@ -520,9 +591,16 @@ class ModelList(Generic[ModelT]):
 
     def __setitem__(self, index, value):
         self._list[index] = value
+        self._clear_cached()
 
     def __delitem__(self, index):
         del self._list[index]
+        self._clear_cached()
+
+    def _clear_cached(self):
+        # Lookups derived from the list are cached on the instance (e.g. by disk name), drop them on mutation
+        for key in [key for key in self.__dict__ if key != "_list"]:
+            del self.__dict__[key]
 
     def __iter__(self):
         return iter(self._list)
@@ -16,7 +16,7 @@ from remoteperf.utils.attrs_util import attrs_init_replacement
 
 
 @attrs_init_replacement
-@attr.s(auto_attribs=True, kw_only=True)
+@attr.s(auto_attribs=True, kw_only=True, slots=True)
 class QnxCpuUsageInfo(BaseCpuUsageInfo):
     pass
 
@@ -1,12 +1,15 @@
 # Copyright 2024 Volvo Cars
 # SPDX-License-Identifier: Apache-2.0
-from collections import namedtuple
-from typing import List, TypeVar, Union
+from functools import cached_property
+from heapq import nlargest
+from operator import attrgetter
+from typing import Callable, Dict, List, TypeVar, Union
 
 import attr
 
 from remoteperf.models.base import (
     ArithmeticBaseInfoModel,
+    ArithmeticBaseModel,
     BaseCpuSample,
     BaseCpuUsageInfo,
     BaseMemorySample,
@@ -31,6 +34,19 @@ NetworkModelT = TypeVar(
 )
 
 
+class _RankedList:
+    @cached_property
+    def _columns(self) -> Dict[str, list]:
+        # Ranking keys per model, computed once per list and shared between highest_* queries
+        return {}
+
+    def _top_n(self, column: str, key: Callable, n: int):
+        values = self._columns.get(column)
+        if values is None:
+            values = self._columns[column] = [key(model) for model in self]
+        return self.__class__(self[index] for index in nlargest(n, range(len(values)), key=values.__getitem__))
+
+
 class ArithmeticModelList(ModelList[ArithmeticModelT]):
     @property
     def avg(self) -> ArithmeticModelT:
@@ -39,10 +55,10 @@ class ArithmeticModelList(ModelList[ArithmeticModelT]):
     @property
     def _sum(self):
         # Only makes sense internally for calculations, do not expose
-        return sum(self[1:], self[0])
+        return ArithmeticBaseModel._sum_models(self)
 
 
-class CpuList(ArithmeticModelList[BaseCpuUsageInfo]):
+class CpuList(ArithmeticModelList[BaseCpuUsageInfo], _RankedList):
     def highest_load_single_core(self, n: int = 5) -> "CpuList":
         """
         Returns the n models with the highest recorded single-core CPU load.
@@ -50,7 +66,7 @@ class CpuList(ArithmeticModelList[BaseCpuUsageInfo]):
         Returns:
             BaseCpuUsageInfo
         """
-        return self.__class__(sorted(self, key=lambda m: max(m.cores.values()), reverse=True)[:n])
+        return self._top_n("peak_core_load", lambda m: max(m.cores.values()), n)
 
 
 class MemoryList(ArithmeticModelList[SystemMemory]):
@@ -61,7 +77,21 @@ class MemoryList(ArithmeticModelList[SystemMemory]):
         Returns:
             MemoryList
         """
-        return self.__class__(sorted(self, key=lambda m: m.mem.used, reverse=True)[:n])
+        return self.__class__(nlargest(n, self, key=lambda m: m.mem.used))
+
+
+_SAMPLE_AGGREGATES = frozenset(
+    (
+        "avg",
+        "_sum",
+        "max_cpu_load",
+        "max_mem_usage",
+        "avg_read_bytes",
+        "avg_write_bytes",
+        "_sum_read_bytes",
+        "_sum_write_bytes",
+    )
+)
 
 
 @attrs_init_replacement
@@ -69,14 +99,21 @@ class MemoryList(ArithmeticModelList[SystemMemory]):
 class ProcessInfo(BaseProcess):
     samples: List[ArithmeticModelList]
 
-    @property
+    def __setattr__(self, name, value):
+        if name == "samples":
+            # Aggregates are memoized since the process lists use them as sort keys, drop them on new samples
+            for key in _SAMPLE_AGGREGATES.intersection(self.__dict__):
+                del self.__dict__[key]
+        super().__setattr__(name, value)
+
+    @cached_property
     def avg(self):
         return self._sum / len(self.samples)
 
-    @property
+    @cached_property
     def _sum(self):
         # Only makes sense internally for calculations, do not expose
-        return sum(self.samples[1:], self.samples[0])
+        return ArithmeticBaseModel._sum_models(self.samples)
 
 
 @attrs_init_replacement
@@ -84,7 +121,7 @@ class ProcessInfo(BaseProcess):
 class CpuSampleProcessInfo(ProcessInfo):
     samples: List[BaseCpuSample]
 
-    @property
+    @cached_property
     def max_cpu_load(self) -> BaseCpuSample:
         """
         Returns the sample with the highest recorded CPU load.
@@ -92,12 +129,7 @@ class CpuSampleProcessInfo(ProcessInfo):
         Returns:
             BaseCpuSample
         """
-        Item = namedtuple("Item", "load model")
-        top = Item(-1, None)
-        for model in self.samples:
-            if model.cpu_load > top.load:
-                top = Item(model.cpu_load, model)
-        return top.model
+        return max(self.samples, key=attrgetter("cpu_load"), default=None)
 
 
 @attrs_init_replacement
@@ -105,7 +137,7 @@ class CpuSampleProcessInfo(ProcessInfo):
 class MemorySampleProcessInfo(ProcessInfo):
     samples: List[BaseMemorySample]
 
-    @property
+    @cached_property
     def max_mem_usage(self) -> BaseMemorySample:
         """
         Returns the sample with the highest recorded memory usage.
@@ -113,12 +145,7 @@ class MemorySampleProcessInfo(ProcessInfo):
         Returns:
             BaseMemorySample
         """
-        Item = namedtuple("Item", "usage model")
-        top = Item(-1, None)
-        for model in self.samples:
-            if model.mem_usage > top.usage:
-                top = Item(model.mem_usage, model)
-        return top.model
+        return max(self.samples, key=attrgetter("mem_usage"), default=None)
 
 
 @attrs_init_replacement
@@ -126,19 +153,19 @@ class MemorySampleProcessInfo(ProcessInfo):
 class DiskIOSampleProcessInfo(ProcessInfo):
     samples: List[DiskIOProcessSample]
 
-    @property
+    @cached_property
     def avg_read_bytes(self):
         return self._sum_read_bytes / len(self.samples)
 
-    @property
+    @cached_property
     def avg_write_bytes(self):
         return self._sum_write_bytes / len(self.samples)
 
-    @property
+    @cached_property
     def _sum_read_bytes(self):
         return sum(model.read_bytes for model in self.samples)
 
-    @property
+    @cached_property
     def _sum_write_bytes(self):
         return sum(model.write_bytes for model in self.samples)
 
@@ -150,7 +177,7 @@ class ResourceSampleProcessInfo(CpuSampleProcessInfo, MemorySampleProcessInfo):
 
 
 # I know, this is insane, I just can't figure out the typing for this one
-class _ProcessCpuList:
+class _ProcessCpuList(_RankedList):
     def highest_average_cpu_load(self, n: int = 5):
         """
         Returns the top `n` processes with the highest average CPU load.
@@ -161,7 +188,7 @@ class _ProcessCpuList:
         Returns:
             ProcessCpuList: A new instance of ProcessCpuList containing the top `n` processes.
         """
-        return self.__class__(sorted(self, key=lambda m: m.avg.cpu_load, reverse=True)[:n])
+        return self._top_n("avg_cpu_load", lambda m: m.avg.cpu_load, n)
 
     def highest_peak_cpu_load(self, n: int = 5):
         """
@@ -173,10 +200,10 @@ class _ProcessCpuList:
         Returns:
             ProcessCpuList: A new instance of ProcessCpuList containing the top `n` processes.
         """
-        return self.__class__(sorted(self, key=lambda m: m.max_cpu_load.cpu_load, reverse=True)[:n])
+        return self._top_n("max_cpu_load", lambda m: m.max_cpu_load.cpu_load, n)
 
 
-class _ProcessMemoryList:
+class _ProcessMemoryList(_RankedList):
     def highest_average_mem_usage(self, n: int = 5):
         """
         Returns the top `n` processes with the highest average memory usage.
@@ -187,7 +214,7 @@ class _ProcessMemoryList:
         Returns:
             ProcessMemoryList: A new instance of ProcessMemoryList containing the top `n` processes.
         """
-        return self.__class__(sorted(self, key=lambda m: m.avg.mem_usage, reverse=True)[:n])
+        return self._top_n("avg_mem_usage", lambda m: m.avg.mem_usage, n)
 
     def highest_peak_mem_usage(self, n: int = 5):
         """
@@ -199,10 +226,10 @@ class _ProcessMemoryList:
         Returns:
             ProcessMemoryList: A new instance of ProcessMemoryList containing the top `n` processes.
         """
-        return self.__class__(sorted(self, key=lambda m: m.max_mem_usage.mem_usage, reverse=True)[:n])
+        return self._top_n("max_mem_usage", lambda m: m.max_mem_usage.mem_usage, n)
 
 
-class _ProcessDiskIOList:
+class _ProcessDiskIOList(_RankedList):
     def highest_average_read_bytes(self, n: int = 5):
         """
         Returns the top `n` processes with the highest average read bytes.
@@ -213,7 +240,7 @@ class _ProcessDiskIOList:
         Returns:
             ProcessDiskIOList: A new instance of ProcessDiskIOList containing the top `n` processes.
         """
-        return self.__class__(sorted(self, key=lambda m: m.avg_read_bytes, reverse=True)[:n])
+        return self._top_n("avg_read_bytes", lambda m: m.avg_read_bytes, n)
 
     def highest_average_write_bytes(self, n: int = 5):
         """
@@ -225,10 +252,13 @@ class _ProcessDiskIOList:
         Returns:
             ProcessDiskIOList: A new instance of ProcessDiskIOList containing the top `n` processes.
         """
-        return self.__class__(sorted(self, key=lambda m: m.avg_write_bytes, reverse=True)[:n])
+        return self._top_n("avg_write_bytes", lambda m: m.avg_write_bytes, n)
 
 
 class _DiskList:
+    # Name of the model attribute identifying the disk
+    _disk_attribute: str
+
     def get_disk(self, disk: str):
         """
         Returns a new instance with only the disk specified.
@@ -239,7 +269,14 @@ class _DiskList:
         Returns:
             DiskList: A new instance of DiskList containing only the specified disk.
         """
-        return self.__class__(filter(lambda m: m.disk == disk, self))
+        return self.__class__(self._by_disk.get(disk, ()))
+
+    @cached_property
+    def _by_disk(self) -> Dict[str, list]:
+        index = {}
+        for model in self:
+            index.setdefault(getattr(model, self._disk_attribute), []).append(model)
+        return index
 
 
 class ProcessCpuList(ModelList[CpuSampleProcessInfo], _ProcessCpuList):
@@ -259,11 +296,11 @@ class ProcessDiskIOList(ModelList[DiskIOSampleProcessInfo], _ProcessDiskIOList):
 
 
 class DiskIOList(ModelList[DiskIOInfo], _DiskList):
-    pass
+    _disk_attribute = "device_name"
 
 
 class DiskInfoList(ModelList[DiskIOInfo], _DiskList):
-    pass
+    _disk_attribute = "filesystem"
 
 
 class NetworkInterfaceList(ModelList[NetworkModelT]):
@@ -274,7 +311,11 @@ class NetworkInterfaceList(ModelList[NetworkModelT]):
         :return: A new instance of NetworkInterfaceList containing all active interfaces (trnsceive rate > 0).
         :rtype: NetworkInterfaceList
         """
-        return self.__class__(filter(lambda interface: interface.avg_transceive_rate > 0, self))
+        return self.__class__(self._active_interfaces)
+
+    @cached_property
+    def _active_interfaces(self) -> tuple:
+        return tuple(interface for interface in self if interface.avg_transceive_rate > 0)
 
 
 class LinuxNetworkInterfaceList(NetworkInterfaceList[LinuxNetworkInterfaceDeltaSampleList]):
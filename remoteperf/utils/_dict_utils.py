@@ -2,16 +2,25 @@ from datetime import datetime
 
 
 def dict_diff(sample1, sample2) -> dict:
+    common_keys = sample1.keys() & sample2.keys()
+    if not common_keys:
+        raise ValueError("No common keys found")
     diff = {}
-    for key in sample1.keys() & sample2.keys():
-        if isinstance(sample1[key], dict) and isinstance(sample2[key], dict):
-            diff[key] = dict_diff(sample1[key], sample2[key])
-        elif isinstance(sample1[key], datetime) and isinstance(sample2[key], datetime):
-            diff[key] = (sample2[key] - sample1[key]).total_seconds()
-        elif isinstance(sample1[key], (int, float)) and isinstance(sample2[key], (int, float)):
-            diff[key] = sample2[key] - sample1[key]
+    for key in common_keys:
+        # Look each value up once; this is called for every key of every sample pair
+        v1 = sample1[key]
+        v2 = sample2[key]
+        # Parsed samples mostly hold plain numbers, so those are checked by exact type first
+        t1 = type(v1)
+        t2 = type(v2)
+        if (t1 is int or t1 is float) and (t2 is int or t2 is float):
+            diff[key] = v2 - v1
+        elif isinstance(v1, dict) and isinstance(v2, dict):
+            diff[key] = dict_diff(v1, v2)
+        elif isinstance(v1, datetime) and isinstance(v2, datetime):
+            diff[key] = (v2 - v1).total_seconds()
+        elif isinstance(v1, (int, float)) and isinstance(v2, (int, float)):
+            diff[key] = v2 - v1
         else:
-            raise ValueError(f"Unsupported type {type(sample1[key])}")
-    if diff:
-        return diff
-    raise ValueError("No common keys found")
+            raise ValueError(f"Unsupported type {type(v1)}")
+    return diff
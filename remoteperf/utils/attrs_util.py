@@ -1,28 +1,47 @@
 # Copyright 2024 Volvo Cars
 # SPDX-License-Identifier: Apache-2.0
 from datetime import datetime
+from functools import lru_cache
 from typing import Union, get_args
 
 from attr import NOTHING, Factory, fields, has
 from cattr import Converter
+from cattr.gen import make_dict_structure_fn
 
 
 # Could not figure out how to make typing work, so we do this workaround
 def attrs_init_replacement(cls=None):
+    # Resolve field defaults once per class rather than on every instantiation
+    init_fields = tuple(
+        (attr.name, attr.default.factory if isinstance(attr.default, Factory) else None, attr.default)
+        for attr in fields(cls)
+    )
+
     def init(self, **kwargs):
 
-        for attr in fields(cls):
-            if not hasattr(self, attr.name):
-                value = kwargs.get(attr.name) if attr.name in kwargs else attr.default
+        for name, factory, default in init_fields:
+            # BaseRemoteperfModel.__new__ may return an instance already built by the converter, which python then
+            # re-initializes with the raw kwargs; the attrs generated init would overwrite the structured values
+            if not hasattr(self, name):
+                if name in kwargs:
+                    value = kwargs[name]
+                elif factory is not None:
+                    value = factory()
+                else:
+                    value = default
                 if isinstance(value, Factory):
                     value = value.factory()
                 if value is NOTHING:
-                    raise ValueError(f"Required attribute '{attr.name}' is missing and does not have a default value.")
+                    raise ValueError(f"Required attribute '{name}' is missing and does not have a default value.")
+                # Part of the public model values (and asserted on), so this can't be deferred to serialization
                 if isinstance(value, float):
                     value = round(value, 3)
-                setattr(self, attr.name, value)
+                # Bypasses attrs' frozen guard so immutable models can share this init
+                object.__setattr__(self, name, value)
 
     cls.__init__ = init
+    # Generate the structuring function once per class instead of on first (fallback) structure call
+    converter.register_structure_hook(cls, make_dict_structure_fn(cls, converter))
     return cls
 
 
@@ -39,7 +58,20 @@ def structure_datetime(value, *_):
     raise ValueError(f"Cannot structure value {value} as {datetime}")
 
 
+@lru_cache(maxsize=None)
+def _union_passthrough_types(cl) -> frozenset:
+    # Types whose instances can be returned as is: every member before them rejects a positional, non-dict value
+    passthrough = set()
+    for union_type in get_args(cl):
+        passthrough.add(union_type)
+        if not (union_type is type(None) or (has(union_type) and all(a.kw_only for a in fields(union_type)))):
+            break
+    return frozenset(passthrough)
+
+
 def structure_union(value, cl):
+    if value.__class__ in _union_passthrough_types(cl) and not isinstance(value, dict):
+        return value
     union_types = get_args(cl)
 
     for union_type in union_types:
@@ -1,6 +1,7 @@
 # Copyright 2024 Volvo Cars
 # SPDX-License-Identifier: Apache-2.0
-import uuid
+import os
+from dataclasses import dataclass
 
 from remoteperf.clients.base_client import BaseClient
 
@@ -13,6 +14,19 @@ class RemotePermissionException(RemoteFsException):
     pass
 
 
+@dataclass(frozen=True)
+class RemotePathInfo:
+    exists: bool
+    is_file: bool
+    is_directory: bool
+    readable: bool
+    writable: bool
+
+
+# Test flags in RemotePathInfo field order
+_PATH_INFO_FLAGS = ("e", "f", "d", "r", "w")
+
+
 class RemoteFs:
     def __init__(self, client, tmp_directory="/tmp") -> None:
         self._client: BaseClient = client
@@ -38,24 +52,36 @@ class RemoteFs:
         file_check = f'[ -r "{path}" ]'
         return self._conditional_check(file_check)
 
+    def path_info(self, path) -> RemotePathInfo:
+        """Runs all path checks in a single command, for callers that need more than one of them."""
+        checks = "; ".join(f'[ -{flag} "{path}" ] && printf 1 || printf 0' for flag in _PATH_INFO_FLAGS)
+        result = self._client.run_command(checks).strip()
+        if len(result) != len(_PATH_INFO_FLAGS) or not set(result) <= {"0", "1"}:
+            raise RemoteFsException(f"Something went wrong during path check: {result}")
+        return RemotePathInfo(*(flag == "1" for flag in result))
+
     def unlink(self, path, force=True):  # Force to prevents prompts
-        if not self.exists(path):
+        info = self.path_info(path)
+        if not info.exists:
             return
-        if not self.has_write_permissions(path):
+        if not info.writable:
             raise RemotePermissionException(f"Insufficient permissions to remove {path}")
-        if self.is_directory(path):
-            out = self._client.run_command(f"rm -r{'f' if force else ''} {path} 2>&1")
+        if info.is_directory:
+            remove = f"rm -r{'f' if force else ''} {path} 2>&1"
         else:
-            out = self._client.run_command(f"rm {'-f' if force else ''} {path} 2>&1")
-        if self.exists(path):
-            raise RemoteFsException(f"Could not remove directory: {out}")
+            remove = f"rm {'-f' if force else ''} {path} 2>&1"
+        # The existence check is appended to the removal so both happen in one round trip
+        out = self._client.run_command(f'{remove}; [ -e "{path}" ] && printf 1 || printf 0').rstrip()
+        if not out.endswith("0"):
+            raise RemoteFsException(f"Could not remove directory: {out[:-1]}")
 
     def _conditional_check(self, command):
-        check_command = f'{command} && echo "True" || echo "False"'
-        result = self._client.run_command(check_command)
-        if "True" not in result and "False" not in result:
+        check_command = f"{command} && printf 1 || printf 0"
+        result = self._client.run_command(check_command).rstrip()
+        # Only the last character is the verdict, anything before it is output of the command itself
+        if not result or result[-1] not in "01":
             raise RemoteFsException(f"Something went wrong during conditional check: {result}")
-        return "True" in result
+        return result[-1] == "1"
 
     class RemoteTemporaryDirectory:
         def __init__(self, remote_fs: "RemoteFs"):
@@ -65,10 +91,10 @@ class RemoteFs:
         def __enter__(self):
             if not self.remote_fs._tmp_directory:
                 raise RemoteFsException("No temporary directory supplied, cannot create remote tmpdir")
-            unique_dir = f"{self.remote_fs._tmp_directory}/{uuid.uuid4()}"
-            self.remote_fs._client.run_command(f"mkdir -p {unique_dir}")
+            unique_dir = f"{self.remote_fs._tmp_directory}/{os.urandom(8).hex()}"
+            created = self.remote_fs._conditional_check(f'mkdir -p {unique_dir} && [ -d "{unique_dir}" ]')
             self.remote_fs._client.add_cleanup(unique_dir, "-rf")
-            if not self.remote_fs.is_directory(unique_dir):
+            if not created:
                 raise RemoteFsException(f"Could not create directory: {unique_dir}")
             self.path = unique_dir
             return self.path
@@ -1,5 +1,7 @@
 # Copyright 2024 Volvo Cars
 # SPDX-License-Identifier: Apache-2.0
+from itertools import repeat
+from operator import add, mul, sub, truediv
 
 
 class Vector(tuple):
@@ -7,27 +9,32 @@ class Vector(tuple):
         values = map(float, iterable)
         return super().__new__(cls, values)
 
+    @classmethod
+    def _from_floats(cls, values):
+        # Arithmetic results are already floats, so the float() conversion pass in __new__ can be skipped
+        return tuple.__new__(cls, values)
+
     def __add__(self, other):
         if len(self) != len(other):
             raise ValueError("Vectors must be of equal lengths")
-        return Vector((a + b for a, b in zip(self, other)))
+        return self._from_floats(map(add, self, other))
 
     def __sub__(self, other):
         if len(self) != len(other):
             raise ValueError("Vectors must be of equal lengths")
-        return Vector((a - b for a, b in zip(self, other)))
+        return self._from_floats(map(sub, self, other))
 
     def __mul__(self, other):
         if not isinstance(other, (float, int)):
             raise ValueError("Vector multiplication only supported with numbers")
-        return Vector((a * other for a in self))
+        return self._from_floats(map(mul, self, repeat(other)))
 
     def __truediv__(self, other):
         if not isinstance(other, (float, int)):
             raise ValueError("Vector division only supported with numbers")
-        return Vector((a / other for a in self))
+        return self._from_floats(map(truediv, self, repeat(other)))
 
     def round(self, ndigits: int = 0):
-        return Vector((round(n, ndigits) for n in self))
+        return self._from_floats(map(round, self, repeat(ndigits)))
 
     __rmul__ = __mul__
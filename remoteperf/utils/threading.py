@@ -1,12 +1,17 @@
 # Copyright 2024 Volvo Cars
 # SPDX-License-Identifier: Apache-2.0
 import threading
-import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from datetime import datetime
+from typing import Optional
 
 from remoteperf.clients.base_client import BaseClient
 
 
+# Seconds after read_delay before the first read of a delegated command's output
+_READ_MARGIN = 0.2
+
+
 class ThreadException(Exception):
     pass
 
@@ -47,52 +52,93 @@ class ExceptionThread(threading.Thread):
         return self._output
 
 
-class DelegatedExecutionThread(ExceptionThread):
+class DelegatedExecutionThread:
+    """
+    Starts a command in the background on the target and reads its output once read_delay has passed.
+    Despite the name this is not a Thread: the read runs on a shared pool, behind the same
+    join/is_alive/exception/timestamp/output interface as ExceptionThread.
+    """
+
+    # Delegated reads are started for every sample, so they run on a shared pool instead of a new thread each
+    _executor = ThreadPoolExecutor(thread_name_prefix="remoteperf_delegated")
+
     def __init__(
         self,
         client: BaseClient,
         command: str,
         uid: str,
         read_delay: float,
-        *args,
+        *,
         retries: int = 3,
         join=False,
-        **kwargs,
     ):
         filename = f"/tmp/remoteperf_delayed_{uid}-{round(datetime.now().timestamp()*100)}"
         # Output from command is streamed into file, so we move the file to avoid race conditions
         command = f"({command}) > {filename}_tmp && mv {filename}_tmp {filename} & echo $!"
         client.add_cleanup("/tmp/remoteperf_delayed_*")
         client.run_command(command)
-        super().__init__(
-            target=self._delayed_file_read_and_remove,
-            args=[read_delay, filename, client],
-            kwargs={"retries": retries},
-            *args,
-            **kwargs,
-        )
-
-        self.start()
+        self._timestamp = None
+        self._future = Future()
+        self._future.set_running_or_notify_cancel()
+        # The first read keeps a margin for the command to finish writing and move its file after read_delay.
+        # A missing file is then polled with exponential backoff, for at most retries seconds in total (the
+        # same as the previous one second per retry).
+        self._schedule_read(read_delay + _READ_MARGIN, filename, client, retries, float(retries), 0.05, [])
+
         if join:
             self.join()
 
-    @staticmethod
-    def _delayed_file_read_and_remove(delay: float, filename: str, client: BaseClient, retries: int = 3) -> str:
-        _retries = retries
-        time.sleep(delay + 0.2)
-        command = f"cat {filename}"
-
-        output = client.run_command(command)
-        test = []
-        while "No such file or directory" in output or not output:
-            test.append(output)
-            if _retries <= 0:
-                raise ThreadException(
-                    f"Failed to read file ({filename}) in expected amount of time, with {retries} retries, {test}"
+    def _schedule_read(self, delay: float, *args) -> None:
+        # The delay is waited out by a timer, so pool threads are only taken by reads that are due
+        timer = threading.Timer(delay, self._submit_read, args)
+        timer.daemon = True
+        timer.start()
+
+    def _submit_read(self, *args) -> None:
+        try:
+            self._executor.submit(self._read, *args)
+        except RuntimeError as e:  # The pool is shut down, e.g. at interpreter exit
+            self._future.set_exception(e)
+
+    def _read(
+        self, filename: str, client: BaseClient, retries: int, remaining_wait: float, backoff: float, outputs: list
+    ) -> None:
+        try:
+            output = client.run_command(f"cat {filename}")
+            if "No such file or directory" in output or not output:
+                outputs.append(output)
+                if remaining_wait <= 0:
+                    raise ThreadException(
+                        f"Failed to read file ({filename}) within {retries} seconds of polling after the read delay, "
+                        f"{outputs}"
+                    )
+                wait_time = min(backoff, remaining_wait)
+                self._schedule_read(
+                    wait_time, filename, client, retries, remaining_wait - wait_time, backoff * 2, outputs
                 )
-            output = client.run_command(command)
-            _retries -= 1
-            time.sleep(1)
-        client.run_command(f"rm {filename}")
+                return
+            client.run_command(f"rm {filename}")
+        # pylint: disable=W0718 # (broad-exception-caught)
+        except Exception as e:
+            self._future.set_exception(e)
+            return
+        self._timestamp = datetime.now()
+        self._future.set_result(output)
 
-        return output
+    def join(self, timeout: Optional[float] = None) -> None:
+        wait((self._future,), timeout=timeout)
+
+    def is_alive(self) -> bool:
+        return not self._future.done()
+
+    @property
+    def exception(self):
+        return self._future.exception() if self._future.done() else None
+
+    @property
+    def timestamp(self) -> str:
+        return self._timestamp
+
+    @property
+    def output(self) -> str:
+        return self._future.result()
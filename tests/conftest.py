@@ -1,23 +1,52 @@
 import fnmatch
+import functools
+import itertools
+import os
 import pathlib
 import random
+import re
+import select
+import shlex
+import shutil
+import socket
 import subprocess
+import threading
 from tempfile import TemporaryDirectory
+from types import SimpleNamespace
 from typing import Optional
 
 import pytest
 import yaml
 
 from remoteperf.clients.base_client import BaseClient
+from remoteperf.handlers import posix_implementation_handler
 from remoteperf.handlers.linux_handler import LinuxHandler
 from remoteperf.handlers.qnx_handler import QNXHandler
 
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:  # libyaml not available
+    from yaml import SafeLoader as _SafeLoader  # type: ignore[assignment]
+
+
+_TEST_FILE_CHARACTERS = 'abcdef-.,_ +1234567890!"#¤%&/()=?'
+_GLOB_CHARACTERS = frozenset("*?[")
+# Commands containing any of these need a shell to be interpreted, anything else is executed directly
+_SHELL_CHARACTERS = frozenset("|&;<>()$`\\*?[]{}~#=%!\n")
+
 
 class MockClient(BaseClient):
     def __init__(self, queries, default=""):
         super().__init__()
         self._queries = queries
         self._default = default
+        # Glob fallbacks compiled once, in reverse so the first match is the last matching key like before. Keys
+        # without wildcards only ever match themselves, which the direct lookup already covers
+        self._patterns = [
+            (re.compile(fnmatch.translate(key)).match, key)
+            for key in reversed(list(queries))
+            if not _GLOB_CHARACTERS.isdisjoint(key)
+        ]
         self._connected = False
         self._generators = {}
         self._cleanup = {}
@@ -30,20 +59,16 @@ class MockClient(BaseClient):
 
     def run_command(self, request):
         if not (data := self._queries.get(request, self._default)):
-            for key in self._queries.keys():
-                if fnmatch.fnmatch(request, key):
-                    data = self._queries.get(key, self._default)
+            for match, key in self._patterns:
+                if match(request):
+                    data = self._queries[key]
+                    break
 
         if isinstance(data, list):
-            if request not in self._generators:
-                self._generators[request] = (d for d in data)
-            try:
-                return next(self._generators[request])
-            except StopIteration:
-                self._generators[request] = (d for d in data)
-                return next(self._generators[request])
-        else:
-            return data
+            if (outputs := self._generators.get(request)) is None:
+                outputs = self._generators[request] = itertools.cycle(data)
+            return next(outputs)
+        return data
 
     def pull_file(self, path: str, dest: str):
         return
@@ -101,41 +126,167 @@ class SubprocessLocalClient(BaseClient):
         self._is_connected = False
 
     def run_command(self, command: str, *_, **__) -> str:
+        if _SHELL_CHARACTERS.isdisjoint(command):
+            try:
+                return subprocess.run(shlex.split(command), text=True, capture_output=True).stdout
+            except OSError:  # Like the shell, which would only have reported it on stderr
+                return ""
+            except ValueError:  # Unbalanced quoting, leave the error reporting to the shell
+                pass
         result = subprocess.run(command, shell=True, text=True, capture_output=True)
         return result.stdout
 
     def pull_file(self, path: str, dest: str):
-        subprocess.run(f"cp {path} {dest}", shell=True, check=True)
+        # shutil.copy, like cp, also accepts a directory as destination
+        shutil.copy(path, dest)
 
     def push_file(self, path: str, dest: str):
-        subprocess.run(f"cp {path} {dest}", shell=True, check=True)
+        shutil.copy(path, dest)
 
     def add_cleanup(self, path: str, flags: Optional[str]) -> None:
         pass
 
 
+class FakeClock:
+    """Virtual time for the measurement threads, which only moves when a test calls advance()"""
+
+    # Real seconds advance() waits for the samplers to catch up, only hit if a sampler thread died
+    _SETTLE_TIMEOUT = 5
+
+    def __init__(self):
+        # Starting at zero keeps the samplers' float arithmetic, and with it the number of samples, the same every run
+        self._now = 0.0
+        self._generation = 0
+        self._condition = threading.Condition()
+        self._flags = []
+        self._idle = {}
+
+    def time(self) -> float:
+        with self._condition:
+            return self._now
+
+    def event(self) -> threading.Event:
+        flag = _ClockEvent(self)
+        with self._condition:
+            self._flags.append(flag)
+        return flag
+
+    def advance(self, seconds: float) -> None:
+        # Returns once every running sampler has taken the samples due and waits for the clock again
+        with self._condition:
+            assert self._condition.wait_for(self._settled, timeout=self._SETTLE_TIMEOUT), "Samplers did not settle"
+            self._now += seconds
+            self._generation += 1
+            self._condition.notify_all()
+            assert self._condition.wait_for(self._settled, timeout=self._SETTLE_TIMEOUT), "Samplers did not settle"
+
+    def stop(self) -> None:
+        # Releases samplers a test left running, their waits on the virtual clock never time out on their own
+        with self._condition:
+            flags = list(self._flags)
+        for flag in flags:
+            flag.set()
+
+    def _settled(self) -> bool:
+        return all(flag.is_set() or self._idle.get(flag) == self._generation for flag in self._flags)
+
+    def _wait(self, flag: threading.Event) -> bool:
+        with self._condition:
+            generation = self._idle[flag] = self._generation
+            self._condition.notify_all()
+            self._condition.wait_for(lambda: flag.is_set() or self._generation != generation)
+            del self._idle[flag]
+        return flag.is_set()
+
+    def _notify(self) -> None:
+        with self._condition:
+            self._condition.notify_all()
+
+
+class _ClockEvent(threading.Event):
+    # Stop flag whose timed waits block on the virtual clock instead of the wall clock
+    def __init__(self, clock: FakeClock):
+        super().__init__()
+        self._clock = clock
+
+    def set(self):
+        super().set()
+        self._clock._notify()  # pylint: disable=W0212
+
+    def wait(self, timeout=None):
+        if timeout is None:
+            return super().wait()
+        return self._clock._wait(self)  # pylint: disable=W0212
+
+
+@pytest.fixture
+def fast_clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(posix_implementation_handler, "time", SimpleNamespace(time=clock.time))
+    monkeypatch.setattr(posix_implementation_handler, "threading", SimpleNamespace(Event=clock.event))
+    yield clock
+    clock.stop()
+
+
+class LocalShell:
+    """A real local shell behind the channel (ssh) and connection (adb) calls the persistent shells use"""
+
+    def __init__(self, shell: str):
+        self._process = subprocess.Popen([shell], stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        self._timeout = None
+        self.conn = self
+        self.closed = False
+
+    def sendall(self, data: bytes):
+        self._process.stdin.write(data)
+        self._process.stdin.flush()
+
+    send = sendall
+
+    def settimeout(self, timeout):
+        self._timeout = timeout
+
+    def recv(self, size):
+        if not select.select([self._process.stdout], [], [], self._timeout)[0]:
+            raise socket.timeout()
+        return os.read(self._process.stdout.fileno(), size)
+
+    def close(self):
+        self.closed = True
+        self._process.kill()
+        self._process.wait()
+
+
+@pytest.fixture(params=["sh", "bash"])
+def local_shell(request):
+    shell = LocalShell(request.param)
+    yield shell
+    shell.close()
+
+
+@functools.lru_cache(maxsize=None)
+def _load_data(name: str):
+    # Parsed once per session, the mock clients only ever read from it
+    with (pathlib.Path(__file__).parent / "data" / name).open() as file:
+        return yaml.load(file, Loader=_SafeLoader)
+
+
 @pytest.fixture
 def extractor_data():
-    with (pathlib.Path(__file__).parent / "data" / "extractor_data.yaml").open() as file:
-        data = yaml.safe_load(file)
-    return data
+    return _load_data("extractor_data.yaml")
 
 
 @pytest.fixture
 def mock_client():
-    with (pathlib.Path(__file__).parent / "data" / "valid_handler_data.yaml").open() as file:
-        queries = yaml.safe_load(file)
-    return MockClient(queries)
+    return MockClient(_load_data("valid_handler_data.yaml"))
 
 
 @pytest.fixture
 def mock_qnx_client():
-    with (pathlib.Path(__file__).parent / "data" / "valid_handler_data_qnx.yaml").open() as file:
-        queries = yaml.safe_load(file)
-    return MockClient(queries)
+    return MockClient(_load_data("valid_handler_data_qnx.yaml"))
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def subprocess_client():
     return SubprocessLocalClient()
 
@@ -145,11 +296,24 @@ def linux_handler(mock_client):
     return LinuxHandler(client=mock_client)
 
 
+@pytest.fixture(scope="module")
+def shared_linux_handler():
+    # For tests that only read from the handler, or share one measurement between them. Commands with a list of
+    # outputs cycle through it, so tests depending on which output they get still need their own linux_handler
+    return LinuxHandler(client=MockClient(_load_data("valid_handler_data.yaml")))
+
+
 @pytest.fixture
 def qnx_handler(mock_client):
     return QNXHandler(client=mock_client)
 
 
+@pytest.fixture(scope="module")
+def shared_qnx_handler():
+    # Like shared_linux_handler, for the qnx tests that only read from the handler
+    return QNXHandler(client=MockClient(_load_data("valid_handler_data.yaml")))
+
+
 @pytest.fixture
 def unique_qnx_handler(mock_qnx_client):
     return QNXHandler(client=mock_qnx_client)
@@ -157,28 +321,23 @@ def unique_qnx_handler(mock_qnx_client):
 
 @pytest.fixture
 def broken_mock_client():
-    with (pathlib.Path(__file__).parent / "data" / "invalid_handler_data.yaml").open() as file:
-        queries = yaml.safe_load(file)
-    return MockClient(queries)
+    return MockClient(_load_data("invalid_handler_data.yaml"))
+
+
+def _random_data_file(tdir: str, size: int) -> pathlib.Path:
+    random.seed(42)
+    test_file = pathlib.Path(tdir) / "file"
+    test_file.write_text("".join(random.choices(_TEST_FILE_CHARACTERS, k=size)), encoding="utf-8")
+    return test_file
 
 
 @pytest.fixture
 def tmp_data_file():
     with TemporaryDirectory() as tdir:
-        random.seed(42)
-        data = ["".join(random.choices('abcdef-.,_ +1234567890!"#¤%&/()=?', k=1000)) for _ in range(10)]
-        test_file = pathlib.Path(tdir) / "file"
-        with open(test_file, "w", encoding="utf-8") as file:
-            file.writelines(data)
-        yield test_file
+        yield _random_data_file(tdir, 10 * 1000)
 
 
 @pytest.fixture
 def tmp_data_file_xl():
     with TemporaryDirectory() as tdir:
-        random.seed(42)
-        data = ["".join(random.choices('abcdef-.,_ +1234567890!"#¤%&/()=?', k=1000)) for _ in range(1000)]
-        test_file = pathlib.Path(tdir) / "file"
-        with open(test_file, "w", encoding="utf-8") as file:
-            file.writelines(data)
-        yield test_file
+        yield _random_data_file(tdir, 1000 * 1000)
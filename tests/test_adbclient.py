@@ -0,0 +1,167 @@
+import gc
+import re
+import socket
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from adbutils import AdbError
+
+from remoteperf.clients.adb_client import ADBClient, ADBClientException
+
+
+class FakeAdbShell:
+    """Stands in for the connection running sh, answering each command with the next of the given outputs"""
+
+    def __init__(self, *outputs: bytes, close=True):
+        self._outputs = list(outputs)
+        self._close = close
+        self._pending = []
+        self.closed = False
+        self.conn = self
+
+    def send(self, data: bytes):
+        marker = re.search(rb"__remoteperf_\w+__", data).group()
+        # Once out of outputs the command never finishes, like sh having exited
+        if self._outputs:
+            self._pending.append(self._outputs.pop(0) + b"\n" + marker + b"\n")
+
+    def settimeout(self, timeout):
+        pass
+
+    def recv(self, _):
+        if self._pending:
+            return self._pending.pop(0)
+        if self._close:
+            return b""
+        raise socket.timeout()
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def mock_device():
+    with patch("remoteperf.clients.adb_client.AdbClient") as mock:
+        mock.return_value = mock
+        device = mock.device.return_value
+        device.serial = "serial"
+        device.get_state.return_value = "device"
+        mock.device_list.return_value = [SimpleNamespace(serial="serial")]
+        yield device
+
+
+@pytest.fixture
+def adb_client(mock_device):
+    client = ADBClient("serial")
+    client.connect()
+    return client
+
+
+def test_connection_count(adb_client):
+    assert adb_client.connection_count == 1
+    adb_client.connect()
+    assert adb_client.connection_count == 1
+    adb_client.disconnect()
+    adb_client.connect()
+    assert adb_client.connection_count == 2
+
+
+def test_shell(adb_client, mock_device):
+    # The first output answers the round trip done when the shell is opened
+    mock_device.open_shell.return_value = FakeAdbShell(b"", b"line 1\x00\nline 2\n", b"2")
+    assert adb_client.run_command("cat file") == "line 1\nline 2\n"
+    assert adb_client.run_command("echo 2") == "2"
+    mock_device.open_shell.assert_called_once_with("sh")
+    mock_device.shell2.assert_not_called()
+
+
+@pytest.mark.parametrize("open_shell", [{"side_effect": AdbError("unsupported")}, {"return_value": FakeAdbShell()}])
+def test_shell_unsupported(adb_client, mock_device, open_shell):
+    mock_device.open_shell.configure_mock(**open_shell)
+    mock_device.shell2.return_value.output = "out\x00put"
+    assert adb_client.run_command("echo output") == "output"
+    assert adb_client.run_command("echo output") == "output"
+    # Not supported once means not supported for the rest of the session
+    mock_device.open_shell.assert_called_once()
+    assert mock_device.shell2.call_count == 2
+    assert adb_client._shell is None
+
+
+def test_shell_timeout(adb_client, mock_device):
+    mock_device.open_shell.side_effect = [FakeAdbShell(b"", close=False), FakeAdbShell(b"", b"output")]
+    assert adb_client.run_command("sleep 10; echo output", timeout=0.01) == "output"
+    assert mock_device.open_shell.call_count == 2
+
+
+def test_shell_recovery(adb_client, mock_device):
+    # The shell dies mid-command while the device drops off the device list for a moment
+    broken_shell = FakeAdbShell(b"")
+    mock_device.open_shell.side_effect = [broken_shell, FakeAdbShell(b"", b"output")]
+    device = SimpleNamespace(serial="serial")
+    adb_client._adb_session.device_list.side_effect = [[], [], [device]]
+    with patch("time.sleep") as sleep:
+        assert adb_client.run_command("echo output") == "output"
+    assert broken_shell.closed
+    assert [call.args[0] for call in sleep.call_args_list] == [0.01, 0.02]
+
+
+def test_shell_recovery_failed(adb_client, mock_device):
+    mock_device.open_shell.return_value = FakeAdbShell(b"")
+    mock_device.get_state.return_value = "offline"
+    clock = [0.0]
+
+    def sleep(seconds):
+        clock[0] += seconds
+
+    with patch("time.time", side_effect=lambda: clock[0]), patch("time.sleep", side_effect=sleep) as mock_sleep:
+        with pytest.raises(ADBClientException, match="offline"):
+            adb_client.run_command("echo output")
+    sleeps = [call.args[0] for call in mock_sleep.call_args_list]
+    # Backs off exponentially between checks, up to a cap, and gives up after the client timeout
+    assert sleeps[:3] == [0.01, 0.02, 0.04]
+    assert max(sleeps) == 0.5
+    assert clock[0] == pytest.approx(10)
+
+
+def test_shell_reset_on_recovery(adb_client, mock_device):
+    # Not answering at first, e.g. while the device is still booting
+    mock_device.open_shell.side_effect = [FakeAdbShell(), FakeAdbShell(b"", b"2")]
+    mock_device.shell2.return_value.output = "1"
+    assert adb_client.run_command("echo 1") == "1"
+    assert not adb_client._shell_supported
+    # A failed command recovers the connection, after which the shell is tried again
+    mock_device.shell2.side_effect = AdbError("closed")
+    assert adb_client.run_command("echo 2") == "2"
+    assert adb_client._shell_supported
+    assert mock_device.open_shell.call_count == 2
+
+
+def test_run_in_shell_incomplete_command(local_shell):
+    # Fails on its own instead of waiting out the timeout for the swallowed marker
+    t0 = time.time()
+    ADBClient._run_in_shell(local_shell, "echo 'unbalanced", timeout=5)
+    ADBClient._run_in_shell(local_shell, "cat <<EOF\nline", timeout=5)
+    assert time.time() - t0 < 2
+    assert ADBClient._run_in_shell(local_shell, "echo next >&2", timeout=5) == "next\n"
+
+
+def test_command_log(adb_client, mock_device, tmp_path):
+    mock_device.open_shell.return_value = FakeAdbShell(b"", b"output", b"output")
+    adb_client.run_command("echo output", log_path=str(tmp_path))
+    # Readable while the client is still connected
+    assert "Command: echo output\nTimestamp:" in (tmp_path / "command_log").read_text()
+    adb_client.run_command("echo output", log_path=str(tmp_path))
+    assert (tmp_path / "command_log").read_text().count("output\n") == 4
+
+
+def test_command_log_closed_without_disconnect(mock_device, tmp_path):
+    adb_client = ADBClient("serial")
+    adb_client.connect()
+    mock_device.open_shell.return_value = FakeAdbShell(b"", b"output")
+    adb_client.run_command("echo output", log_path=str(tmp_path))
+    log_file = adb_client._log_files[str(tmp_path)]
+    del adb_client
+    gc.collect()
+    assert log_file.closed
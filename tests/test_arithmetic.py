@@ -1,16 +1,15 @@
 import textwrap
-import time
 
 from remoteperf.handlers.linux_handler import LinuxHandler
-from remoteperf.models.base import ExtendedMemoryInfo, MemoryInfo, SystemMemory
+from remoteperf.models.base import ArithmeticBaseModel, ExtendedMemoryInfo, MemoryInfo, SystemMemory
 from remoteperf.models.linux import LinuxCpuUsageInfo
 
 
-def test_avg_cpu(linux_handler: LinuxHandler):
+def test_avg_cpu(linux_handler: LinuxHandler, fast_clock):
     linux_handler.start_cpu_measurement(0.1)
-    time.sleep(0.5)
+    fast_clock.advance(0.5)
     output = linux_handler.stop_cpu_measurement()[:3]
-    assert output.avg.model_dump(exclude="timestamp") == LinuxCpuUsageInfo(
+    assert output.avg.model_dump(exclude={"timestamp"}) == LinuxCpuUsageInfo(
         **{
             "cores": {"0": 2.0},
             "load": 2.0,
@@ -27,26 +26,26 @@ def test_avg_cpu(linux_handler: LinuxHandler):
                 "user": 2.0,
             },
         }
-    ).model_dump(exclude="timestamp")
+    ).model_dump(exclude={"timestamp"})
 
 
-def test_avg_memory(linux_handler: LinuxHandler):
+def test_avg_memory(linux_handler: LinuxHandler, fast_clock):
     linux_handler.start_mem_measurement(0.1)
-    time.sleep(0.5)
+    fast_clock.advance(0.5)
     output = linux_handler.stop_mem_measurement()[:2]
-    assert output.avg.model_dump(exclude="timestamp") == SystemMemory(
+    assert output.avg.model_dump(exclude={"timestamp"}) == SystemMemory(
         mem=ExtendedMemoryInfo(
             total=32031624, used=6024669, free=18189335, shared=909004, buff_cache=7817620, available=24630431
         ),
         swap=MemoryInfo(total=2002940, used=0, free=2002940),
-    ).model_dump(exclude="timestamp")
+    ).model_dump(exclude={"timestamp"})
 
 
-def test_max_cpu_core(linux_handler: LinuxHandler):
+def test_max_cpu_core(linux_handler: LinuxHandler, fast_clock):
     linux_handler.start_cpu_measurement(0.1)
-    time.sleep(0.5)
+    fast_clock.advance(0.5)
     output = linux_handler.stop_cpu_measurement()[:3]
-    assert output.highest_load_single_core(1)[0].model_dump(exclude="timestamp") == LinuxCpuUsageInfo(
+    assert output.highest_load_single_core(1)[0].model_dump(exclude={"timestamp"}) == LinuxCpuUsageInfo(
         **{
             "cores": {"0": 3.0},
             "load": 3.0,
@@ -63,24 +62,24 @@ def test_max_cpu_core(linux_handler: LinuxHandler):
                 "user": 3.0,
             },
         }
-    ).model_dump(exclude="timestamp")
+    ).model_dump(exclude={"timestamp"})
 
 
-def test_max_memory(linux_handler: LinuxHandler):
+def test_max_memory(linux_handler: LinuxHandler, fast_clock):
     linux_handler.start_mem_measurement(0.1)
-    time.sleep(0.5)
+    fast_clock.advance(0.5)
     output = linux_handler.stop_mem_measurement()[:2]
-    assert output.highest_memory_used(1)[0].model_dump(exclude="timestamp") == SystemMemory(
+    assert output.highest_memory_used(1)[0].model_dump(exclude={"timestamp"}) == SystemMemory(
         mem=ExtendedMemoryInfo(
             total=32031624, used=6024670, free=18189334, shared=909004, buff_cache=7817620, available=24630430
         ),
         swap=MemoryInfo(total=2002940, used=0, free=2002940),
-    ).model_dump(exclude="timestamp")
+    ).model_dump(exclude={"timestamp"})
 
 
-def test_highest_average_usage_proc_wise(linux_handler: LinuxHandler):
+def test_highest_average_usage_proc_wise(linux_handler: LinuxHandler, fast_clock):
     linux_handler.start_mem_measurement_proc_wise(0.1)
-    time.sleep(0.6)
+    fast_clock.advance(0.6)
     output = linux_handler.stop_mem_measurement_proc_wise()
     for i, model in enumerate(output):
         model.samples = model.samples[:3]
@@ -90,9 +89,9 @@ def test_highest_average_usage_proc_wise(linux_handler: LinuxHandler):
     assert values == [6700.0, 4316.0]
 
 
-def test_highest_peak_usage_proc_wise(linux_handler: LinuxHandler):
+def test_highest_peak_usage_proc_wise(linux_handler: LinuxHandler, fast_clock):
     linux_handler.start_mem_measurement_proc_wise(0.1)
-    time.sleep(0.6)
+    fast_clock.advance(0.6)
     output = linux_handler.stop_mem_measurement_proc_wise()
     for i, model in enumerate(output):
         model.samples = model.samples[:3]
@@ -103,9 +102,9 @@ def test_highest_peak_usage_proc_wise(linux_handler: LinuxHandler):
     assert values == [8000.0, 6700.0]
 
 
-def test_highest_average_load_proc_wise(linux_handler: LinuxHandler):
+def test_highest_average_load_proc_wise(linux_handler: LinuxHandler, fast_clock):
     linux_handler.start_cpu_measurement_proc_wise(0.1)
-    time.sleep(0.8)
+    fast_clock.advance(0.8)
     output = linux_handler.stop_cpu_measurement_proc_wise()
     for i, model in enumerate(output):
         model.samples = model.samples[:3]
@@ -115,9 +114,9 @@ def test_highest_average_load_proc_wise(linux_handler: LinuxHandler):
     assert values == [11.0, 6.333]
 
 
-def test_highest_peak_load_proc_wise(linux_handler: LinuxHandler):
+def test_highest_peak_load_proc_wise(linux_handler: LinuxHandler, fast_clock):
     linux_handler.start_cpu_measurement_proc_wise(0.1)
-    time.sleep(0.6)
+    fast_clock.advance(0.6)
     output = linux_handler.stop_cpu_measurement_proc_wise()
     for i, model in enumerate(output):
         model.samples = model.samples[:3]
@@ -127,9 +126,9 @@ def test_highest_peak_load_proc_wise(linux_handler: LinuxHandler):
     assert values == [17.0, 12.0]
 
 
-def test_filter_by_command(linux_handler: LinuxHandler):
+def test_filter_by_command(linux_handler: LinuxHandler, fast_clock):
     linux_handler.start_cpu_measurement_proc_wise(0.1)
-    time.sleep(1)
+    fast_clock.advance(1)
     output = linux_handler.stop_cpu_measurement_proc_wise()
     assert any(["android.hardware" in process.command for process in output])
     assert all(
@@ -140,9 +139,9 @@ def test_filter_by_command(linux_handler: LinuxHandler):
     )
 
 
-def test_sort_by_jsonpath(linux_handler: LinuxHandler):
+def test_sort_by_jsonpath(linux_handler: LinuxHandler, fast_clock):
     linux_handler.start_mem_measurement(0.1)
-    time.sleep(1)
+    fast_clock.advance(1)
     output = linux_handler.stop_mem_measurement()
     prev_free = 0
     for model in output.sort_by_jsonpath("mem.free"):
@@ -171,3 +170,22 @@ def test_yaml_property(linux_handler: LinuxHandler):
             """
         ).strip()
     )
+
+
+def test_reassigned_samples_update_aggregates(linux_handler: LinuxHandler, fast_clock):
+    linux_handler.start_cpu_measurement_proc_wise(0.1)
+    fast_clock.advance(0.6)
+    output = linux_handler.stop_cpu_measurement_proc_wise()
+    model = output.highest_peak_cpu_load(1)[0]
+    peak = model.max_cpu_load
+    model.samples = [sample for sample in model.samples if sample is not peak]
+    assert model.max_cpu_load is not peak
+    assert model.avg.cpu_load == (sum(model.samples[1:], model.samples[0]) / len(model.samples)).cpu_load
+
+
+def test_bool_values():
+    # bool is an int subclass and goes through int() like one
+    dict1 = {"a": True, "b": {"c": 1}}
+    dict2 = {"a": True, "b": {"c": False}}
+    assert ArithmeticBaseModel._recursive_op_dict(dict1, dict2, lambda a, b: a + b) == {"a": 2, "b": {"c": 1}}
+    assert ArithmeticBaseModel._recursive_op_scalar({"a": True}, 2, lambda a, b: a / b) == {"a": 0}
@@ -1,14 +1,18 @@
 from tempfile import TemporaryDirectory
+from unittest.mock import MagicMock
 
 import pytest
 
 from remoteperf.handlers.linux_handler import LinuxHandler
+from remoteperf.utils.fs_utils import RemoteFs, RemoteFsException
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def subprocess_linux_handler(subprocess_client):
+    # The tests only probe the local filesystem, so one connected handler is shared by the module
     subprocess_client.connect()
-    return LinuxHandler(client=subprocess_client)
+    yield LinuxHandler(client=subprocess_client)
+    subprocess_client.disconnect()
 
 
 def test_exists(subprocess_linux_handler):
@@ -34,3 +38,46 @@ def test_is_file(subprocess_linux_handler, tmp_data_file):
 
 def test_is_not_file(subprocess_linux_handler):
     assert not subprocess_linux_handler.fs_utils.is_file("/dev")
+
+
+def test_path_info(subprocess_linux_handler, tmp_data_file):
+    file_info = subprocess_linux_handler.fs_utils.path_info(tmp_data_file)
+    assert file_info.exists and file_info.is_file and not file_info.is_directory
+    assert file_info.readable and file_info.writable
+    assert not subprocess_linux_handler.fs_utils.path_info("/will_to_live").exists
+
+
+def test_unlink(subprocess_linux_handler):
+    with TemporaryDirectory() as tdir:
+        subprocess_linux_handler.fs_utils.unlink(tdir)
+        assert not subprocess_linux_handler.fs_utils.exists(tdir)
+
+
+def test_capabilities_reset_on_reconnect():
+    client = MagicMock()
+    client.connection_count = 1
+    client.run_command.return_value = "/usr/bin/hogs"
+    handler = LinuxHandler(client=client)
+    assert handler._has_capability("hogs")
+    assert handler._has_capability("hogs")
+    assert client.run_command.call_count == 1
+    client.connection_count = 2
+    assert handler._has_capability("hogs")
+    assert client.run_command.call_count == 2
+
+
+@pytest.mark.parametrize("line_end", ["", "\n", "\r\n"])
+def test_unlink_line_end(line_end):
+    # E.g. the adb shell2 fallback ends its output with a newline
+    client = MagicMock()
+    client.run_command.side_effect = [f"11011{line_end}", f"0{line_end}"]
+    RemoteFs(client).unlink("/tmp/file")
+    client.run_command.side_effect = [f"11011{line_end}", f"rm: busy\n1{line_end}"]
+    with pytest.raises(RemoteFsException, match="rm: busy"):
+        RemoteFs(client).unlink("/tmp/file")
+
+
+@pytest.mark.parametrize("interval", [0, 0.3])
+def test_cpu_usage(subprocess_linux_handler, interval):
+    # Back to back samples and a fractional remote sleep, on a real /proc/stat
+    assert 0 <= subprocess_linux_handler.get_cpu_usage(interval=interval).load <= 100
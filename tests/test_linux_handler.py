@@ -1,7 +1,11 @@
+import operator
 import time
+from unittest.mock import patch
 
 import pytest
 
+from remoteperf._parsers import linux as linux_parsers
+from remoteperf._parsers.generic import ParsingError
 from remoteperf.handlers.base_linux_handler import BaseLinuxHandlerException
 from remoteperf.handlers.linux_handler import LinuxHandler, LinuxHandlerException, MissingLinuxCapabilityException
 from remoteperf.models.base import (
@@ -38,8 +42,8 @@ from remoteperf.models.super import (
 )
 
 
-def get_time_py_pid(lst, pid):
-    return next((e.samples[0].timestamp for e in lst if e.pid == pid), None)
+def timestamps_by_pid(lst):
+    return {e.pid: e.samples[0].timestamp for e in lst}
 
 
 @pytest.fixture
@@ -47,44 +51,44 @@ def broken_linux_handler(broken_mock_client):
     return LinuxHandler(client=broken_mock_client)
 
 
-def test_memory(linux_handler):
-    output = linux_handler.get_mem_usage()
+def test_memory(shared_linux_handler):
+    output = shared_linux_handler.get_mem_usage()
     assert output.mem == ExtendedMemoryInfo(
         total=32031624, used=6024668, free=18189336, shared=909004, buff_cache=7817620, available=24630432
     )
     assert isinstance(output, SystemMemory)
 
 
-def test_swap(linux_handler):
-    output = linux_handler.get_mem_usage()
+def test_swap(shared_linux_handler):
+    output = shared_linux_handler.get_mem_usage()
     assert output.swap == MemoryInfo(total=2002940, used=0, free=2002940)
 
 
-def test_boot_total(linux_handler):
-    output = linux_handler.get_boot_time()
+def test_boot_total(shared_linux_handler):
+    output = shared_linux_handler.get_boot_time()
     assert output.total == 23.132
     assert isinstance(output, BootTimeInfo)
 
 
-def test_boot_extra(linux_handler):
-    output = linux_handler.get_boot_time()
+def test_boot_extra(shared_linux_handler):
+    output = shared_linux_handler.get_boot_time()
     assert output.extra == {"kernel": 11.406, "userspace": 11.725, "graphical.target": 11.679}
 
 
-def test_cpu_load(linux_handler):
-    output = linux_handler.get_cpu_usage()
+def test_cpu_load(shared_linux_handler):
+    output = shared_linux_handler.get_cpu_usage()
     assert output.load == 1.0
     assert isinstance(output, LinuxCpuUsageInfo)
     assert isinstance(output, BaseCpuUsageInfo)
 
 
-def test_cpu_cores(linux_handler):
-    output = linux_handler.get_cpu_usage()
+def test_cpu_cores(shared_linux_handler):
+    output = shared_linux_handler.get_cpu_usage()
     assert output.cores == {"0": 1.0}
 
 
-def test_cpu_modes(linux_handler):
-    output = linux_handler.get_cpu_usage()
+def test_cpu_modes(shared_linux_handler):
+    output = shared_linux_handler.get_cpu_usage()
     assert output.mode_usage == LinuxCpuModeUsageInfo(
         user=1.0,
         nice=0,
@@ -99,9 +103,44 @@ def test_cpu_modes(linux_handler):
     )
 
 
-def test_continuous_cpu_load_values(linux_handler):
+def test_cpu_load_no_interval(linux_handler):
+    # Samples taken back to back, locally
+    output = linux_handler.get_cpu_usage(interval=0)
+    assert output.load == 1.0
+
+
+def test_cpu_load_sleep_rejected(linux_handler):
+    sample = "cpu  1291056 2508 364484 13290545 7725 0 5683 0 0 0\n"
+    with patch.object(linux_handler, "_cpu_measurement_pair", return_value=f"{sample}e39f7761903b\n") as pair:
+        assert linux_handler.get_cpu_usage().load == 1.0
+        linux_handler.get_cpu_usage()
+    # Fractional sleeps are timed locally from then on, whole seconds still on the target
+    pair.assert_called_once()
+    assert linux_handler.get_cpu_usage(interval=1).load == 1.0
+
+
+def test_cpu_core_no_elapsed_ticks():
+    sample_1 = "cpu  100 0 0 100 0 0 0 0 0 0\ncpu0  50 0 0 50 0 0 0 0 0 0\ncpu1  50 0 0 50 0 0 0 0 0 0\n"
+    sample_2 = "cpu  101 0 0 101 0 0 0 0 0 0\ncpu0  51 0 0 51 0 0 0 0 0 0\ncpu1  50 0 0 50 0 0 0 0 0 0\n"
+    assert linux_parsers.parse_proc_stat(sample_1, sample_2)["cores"] == {"0": 50.0, "1": 0.0}
+
+
+def test_proc_stat_cpu_prefix():
+    line = " ".join(["0"] * 10)
+    assert list(linux_parsers.parse_proc_stat_raw(f"cpu {line}\ncpu0 {line}\ncpuX {line}\n")) == ["cpu", "cpu0"]
+
+
+def test_proc_stat_non_numeric_field():
+    fields = ["1", "(init)", "S", *["0"] * 49]
+    assert linux_parsers.parse_times_from_proc_files([" ".join(fields) + "\n/sbin/init\n"], 4096)
+    fields[13] = "x"
+    with pytest.raises(ParsingError):
+        linux_parsers.parse_times_from_proc_files([" ".join(fields) + "\n/sbin/init\n"], 4096)
+
+
+def test_continuous_cpu_load_values(linux_handler, fast_clock):
     linux_handler.start_cpu_measurement(0.1)
-    time.sleep(0.5)
+    fast_clock.advance(0.5)
     output = linux_handler.stop_cpu_measurement()
     for i, model in enumerate(output):
         assert model.load == i + 1
@@ -109,25 +148,24 @@ def test_continuous_cpu_load_values(linux_handler):
         assert isinstance(model, BaseCpuUsageInfo)
 
 
-def test_continuous_cpu_load_cores(linux_handler):
+def test_continuous_cpu_load_cores(linux_handler, fast_clock):
     linux_handler.start_cpu_measurement(0.1)
-    time.sleep(0.5)
+    fast_clock.advance(0.5)
     output = linux_handler.stop_cpu_measurement()
     for i, model in enumerate(output):
         assert model.cores["0"] == i + 1
 
 
-def test_continuous_cpu_load_count(linux_handler):
+def test_continuous_cpu_load_count(linux_handler, fast_clock):
     linux_handler.start_cpu_measurement(0.1)
-    time.sleep(0.5)
+    fast_clock.advance(0.5)
     output = linux_handler.stop_cpu_measurement()
-    # Range to account for flakeyness and potentially overloaded node processor in CI
-    assert len(output) >= 3 and len(output) <= 5
+    assert len(output) == 4
 
 
-def test_continuous_memory(linux_handler):
+def test_continuous_memory(linux_handler, fast_clock):
     linux_handler.start_mem_measurement(0.1)
-    time.sleep(0.5)
+    fast_clock.advance(0.5)
     output = linux_handler.stop_mem_measurement()
     for model in output:
         assert isinstance(model, SystemMemory)
@@ -138,28 +176,26 @@ def test_continuous_memory(linux_handler):
         "shared": 909004,
         "buff_cache": 7817620,
         "available": 24630432,
-    } in [out.mem.model_dump(exclude="timestamp") for out in output]
+    } in [out.mem.model_dump(exclude={"timestamp"}) for out in output]
 
 
-def test_continuous_cpu_load_proc_wise_count(linux_handler):
+def test_continuous_cpu_load_proc_wise_count(linux_handler, fast_clock):
     linux_handler.start_cpu_measurement_proc_wise(0.1)
-    time.sleep(0.5)
+    fast_clock.advance(0.5)
     output = linux_handler.stop_cpu_measurement_proc_wise()
-    # Range to account for flakeyness and potentially overloaded node processor in CI
-    assert len(output[0].samples) >= 3 and len(output[0].samples) <= 5
+    assert len(output[0].samples) == 4
 
 
-def test_continuous_mem_load_proc_wise_count(linux_handler):
+def test_continuous_mem_load_proc_wise_count(linux_handler, fast_clock):
     linux_handler.start_mem_measurement_proc_wise(0.1)
-    time.sleep(0.5)
+    fast_clock.advance(0.5)
     output = linux_handler.stop_mem_measurement_proc_wise()
-    # Range to account for flakeyness and potentially overloaded node processor in CI
-    assert len(output[0].samples) >= 4 and len(output[0].samples) <= 7
+    assert len(output[0].samples) == 5
 
 
-def test_continuous_cpu_load_proc_wise_values(linux_handler):
+def test_continuous_cpu_load_proc_wise_values(linux_handler, fast_clock):
     linux_handler.start_cpu_measurement_proc_wise(0.1)
-    time.sleep(0.5)
+    fast_clock.advance(0.5)
     output = linux_handler.stop_cpu_measurement_proc_wise()
     reference = ResourceSampleProcessInfo(
         pid=1,
@@ -168,13 +204,14 @@ def test_continuous_cpu_load_proc_wise_values(linux_handler):
         start_time="30",
         samples=[LinuxResourceSample(mem_usage=6700.0, cpu_load=10.0)],
     )
-    assert output[0].model_dump(exclude="samples") == reference.model_dump(exclude="samples")
-    assert output[0].samples[0].model_dump(exclude="timestamp") == reference.samples[0].model_dump(exclude="timestamp")
+    assert output[0].model_dump(exclude={"samples"}) == reference.model_dump(exclude={"samples"})
+    assert output[0].samples[0].cpu_load == reference.samples[0].cpu_load
+    assert output[0].samples[0].mem_usage == reference.samples[0].mem_usage
 
 
-def test_continuous_mem_load_proc_wise_values(linux_handler):
+def test_continuous_mem_load_proc_wise_values(linux_handler, fast_clock):
     linux_handler.start_mem_measurement_proc_wise(0.1)
-    time.sleep(0.5)
+    fast_clock.advance(0.5)
     output = linux_handler.stop_mem_measurement_proc_wise()
     reference = MemorySampleProcessInfo(
         pid=1,
@@ -183,12 +220,12 @@ def test_continuous_mem_load_proc_wise_values(linux_handler):
         start_time="30",
         samples=[BaseMemorySample(mem_usage=6700.0)],
     )
-    assert output[0].model_dump(exclude="samples") == reference.model_dump(exclude="samples")
-    assert output[0].samples[0].model_dump(exclude="timestamp") == reference.samples[0].model_dump(exclude="timestamp")
+    assert output[0].model_dump(exclude={"samples"}) == reference.model_dump(exclude={"samples"})
+    assert output[0].samples[0].mem_usage == reference.samples[0].mem_usage
 
 
-def test_system_uptime(linux_handler):
-    output = linux_handler.get_system_uptime()
+def test_system_uptime(shared_linux_handler):
+    output = shared_linux_handler.get_system_uptime()
     assert output.total == 10978.92
     assert isinstance(output, SystemUptimeInfo)
 
@@ -199,19 +236,25 @@ def test_exception_memory(broken_linux_handler):
         broken_linux_handler.get_mem_usage()
 
 
+def test_exception_cpu_no_elapsed_ticks(broken_linux_handler):
+    with pytest.raises(BaseLinuxHandlerException):
+        broken_linux_handler.get_cpu_usage(interval=1)
+
+
 def test_exception_boot(broken_linux_handler):
     with pytest.raises(LinuxHandlerException):
         broken_linux_handler.get_boot_time()
 
 
-def test_mem_usage_proc_wise(linux_handler):
-    output = linux_handler.get_mem_usage_proc_wise()
+def test_mem_usage_proc_wise(shared_linux_handler):
+    output = shared_linux_handler.get_mem_usage_proc_wise()
+    timestamps = timestamps_by_pid(output)
 
     process = MemorySampleProcessInfo(
         pid=1005,
         name="classifier@1.0-",
         command="/vendor/bin/hw/android.hardware.input.classifier@1.0-service.default",
-        samples=[BaseMemorySample(timestamp=get_time_py_pid(output, 1005), mem_usage=4316.0)],
+        samples=[BaseMemorySample(timestamp=timestamps.get(1005), mem_usage=4316.0)],
         start_time="5762",
     )
     assert process in output
@@ -221,39 +264,40 @@ def test_mem_usage_proc_wise(linux_handler):
 
 
 def test_cpu_modes_proc_wise(linux_handler):
-    output = linux_handler.get_cpu_usage_proc_wise()
+    output = linux_handler.get_cpu_usage_proc_wise(interval=0.01)
+    timestamps = timestamps_by_pid(output)
 
     processes = [
         ResourceSampleProcessInfo(
             pid=1,
             name="init",
             command="/system/bin/initsecond_stage",
-            samples=[LinuxResourceSample(timestamp=get_time_py_pid(output, 1), mem_usage=6700.0, cpu_load=10.0)],
+            samples=[LinuxResourceSample(timestamp=timestamps.get(1), mem_usage=6700.0, cpu_load=10.0)],
             start_time="30",
         ),
         ResourceSampleProcessInfo(
             pid=10,
             name="rcu_tasks_kthre",
             command="rcu_tasks_kthre",
-            samples=[LinuxResourceSample(timestamp=get_time_py_pid(output, 10), mem_usage=8000.0, cpu_load=1.0)],
+            samples=[LinuxResourceSample(timestamp=timestamps.get(10), mem_usage=8000.0, cpu_load=1.0)],
             start_time="30",
         ),
         ResourceSampleProcessInfo(
             pid=1005,
             name="classifier@1.0-",
             command="/vendor/bin/hw/android.hardware.input.classifier@1.0-service.default",
-            samples=[LinuxResourceSample(timestamp=get_time_py_pid(output, 1005), mem_usage=4316.0, cpu_load=0.0)],
+            samples=[LinuxResourceSample(timestamp=timestamps.get(1005), mem_usage=4316.0, cpu_load=0.0)],
             start_time="5762",
         ),
     ]
     for process in processes:
         assert process in output
-        assert all(isinstance(sample, BaseCpuSample) for sample in process.samples)
+    assert all(isinstance(sample, BaseCpuSample) for process in output for sample in process.samples)
 
 
-def test_type_process(linux_handler: LinuxHandler):
+def test_type_process(linux_handler: LinuxHandler, fast_clock):
     linux_handler.start_mem_measurement_proc_wise(0.1)
-    time.sleep(0.5)
+    fast_clock.advance(0.5)
     output = linux_handler.stop_mem_measurement_proc_wise()[:2]
     assert isinstance(output, ModelList)
     assert output.__class__ == ProcessMemoryList
@@ -278,16 +322,24 @@ desired_output_info = DiskInfoList(
 )
 
 
-def test_disc_info(linux_handler):
-    output = linux_handler.get_diskinfo()
-    assert output.model_dump(exclude="timestamp") == desired_output_info.model_dump(exclude="timestamp")
+def test_disc_info(shared_linux_handler):
+    output = shared_linux_handler.get_diskinfo()
+    assert output == desired_output_info
 
 
 def test_disc_info_cont(linux_handler):
     linux_handler.start_diskinfo_measurement(0.1)
     time.sleep(0.05)
     output = linux_handler.stop_diskinfo_measurement()
-    assert output.model_dump(exclude="timestamp") == desired_output_info.model_dump(exclude="timestamp")
+    assert output == desired_output_info
+
+
+def test_disc_info_get_disk(shared_linux_handler):
+    output = shared_linux_handler.get_diskinfo()
+    assert output.get_disk("/dev/sda") == desired_output_info
+    assert len(output.get_disk("/dev/sdb")) == 0
+    del output[0]
+    assert len(output.get_disk("/dev/sda")) == 0
 
 
 desired_output_usage = DiskIOList(
@@ -315,18 +367,25 @@ desired_output_usage = DiskIOList(
         )
     ]
 )
+desired_output_usage_dump = desired_output_usage.model_dump(exclude={"timestamp"})
+
+
+def test_discio(shared_linux_handler):
+    output = shared_linux_handler.get_diskio()
+    assert output.model_dump(exclude={"timestamp"}) == desired_output_usage_dump
 
 
-def test_discio(linux_handler):
-    output = linux_handler.get_diskio()
-    assert output.model_dump(exclude="timestamp") == desired_output_usage.model_dump(exclude="timestamp")
+def test_discio_get_disk(shared_linux_handler):
+    output = shared_linux_handler.get_diskio()
+    assert output.get_disk("sda").model_dump(exclude={"timestamp"}) == desired_output_usage_dump
+    assert len(output.get_disk("sdb")) == 0
 
 
 def test_discio_cont(linux_handler):
     linux_handler.start_diskio_measurement(0.1)
     time.sleep(0.05)
     output = linux_handler.stop_diskio_measurement()
-    assert output.model_dump(exclude="timestamp") == desired_output_usage.model_dump(exclude="timestamp")
+    assert output.model_dump(exclude={"timestamp"}) == desired_output_usage_dump
 
 
 sample = DiskIOProcessSample(
@@ -338,6 +397,10 @@ sample = DiskIOProcessSample(
     write_bytes=6,
     cancelled_write_bytes=7,
 )
+# The sample fields compared by value, without the timestamp
+sample_values = operator.attrgetter(
+    "rchar", "wchar", "syscr", "syscw", "read_bytes", "write_bytes", "cancelled_write_bytes"
+)
 desired_output_usage_proc_atomic = ProcessDiskIOList(
     [
         DiskIOSampleProcessInfo(
@@ -351,9 +414,10 @@ desired_output_usage_proc_atomic = ProcessDiskIOList(
 )
 
 
-def test_discio_proc(linux_handler):
-    output = linux_handler.get_diskio_proc_wise()
-    assert output.model_dump(exclude="timestamp") == desired_output_usage_proc_atomic.model_dump(exclude="timestamp")
+def test_discio_proc(shared_linux_handler):
+    output = shared_linux_handler.get_diskio_proc_wise()
+    assert output.model_dump(exclude={"samples"}) == desired_output_usage_proc_atomic.model_dump(exclude={"samples"})
+    assert [sample_values(s) for s in output[0].samples] == [sample_values(sample)]
 
 
 desired_output_usage_proc_cont = ProcessDiskIOList(
@@ -373,7 +437,8 @@ def test_discio_proc_cont(linux_handler):
     linux_handler.start_diskio_measurement_proc_wise(0.1)
     time.sleep(0.15)
     output = linux_handler.stop_diskio_measurement_proc_wise()
-    assert output.model_dump(exclude="timestamp") == desired_output_usage_proc_cont.model_dump(exclude="timestamp")
+    assert output.model_dump(exclude={"samples"}) == desired_output_usage_proc_cont.model_dump(exclude={"samples"})
+    assert [sample_values(s) for s in output[0].samples] == [sample_values(sample)] * 2
     assert output[0].avg_read_bytes == 5.0
     assert output[0].avg_write_bytes == 6.0
     assert output[0]._sum_read_bytes == 10
@@ -430,10 +495,9 @@ def test_network_usage_total(linux_handler):
             ),
         ),
     ]
-    for interface in output:
-        assert interface.model_dump(exclude=["timestamp"]) == desired_output_total.pop(0).model_dump(
-            exclude=["timestamp"]
-        )
+    assert [interface.model_dump(exclude={"timestamp"}) for interface in output] == [
+        interface.model_dump(exclude={"timestamp"}) for interface in desired_output_total
+    ]
 
 
 desired_output = LinuxNetworkInterfaceList(
@@ -506,22 +570,28 @@ desired_output = LinuxNetworkInterfaceList(
 
 def test_network_usage(linux_handler):
     output = linux_handler.get_network_usage(interval=0.1)
+    desired = desired_output.model_dump(exclude={"timestamp"})
     for interface in output:
-        assert interface.model_dump(exclude="timestamp") in desired_output.model_dump(exclude="timestamp")
+        assert interface.model_dump(exclude={"timestamp"}) in desired
 
 
 def test_network_usage_continuous(linux_handler):
     linux_handler.start_net_interface_measurement(interval=0.1)
     time.sleep(0.1)
     output = linux_handler.stop_net_interface_measurement()
+    desired = desired_output.model_dump(exclude={"timestamp"})
     for interface in output:
-        assert interface.model_dump(exclude="timestamp") in desired_output.model_dump(exclude="timestamp")
+        assert interface.model_dump(exclude={"timestamp"}) in desired
 
 
-def test_network_calc_tranceive(linux_handler):
-    linux_handler.start_net_interface_measurement(interval=0.1)
+@pytest.fixture(scope="module")
+def net_measurement_output(shared_linux_handler):
+    shared_linux_handler.start_net_interface_measurement(interval=0.1)
     time.sleep(0.1)
-    output = linux_handler.stop_net_interface_measurement()
+    return shared_linux_handler.stop_net_interface_measurement()
+
+
+def test_network_calc_tranceive(net_measurement_output):
     desired_transceive_output = {
         "lo": BaseNetworkTranceiveDeltaSample(
             kibibytes=3.0,
@@ -534,34 +604,19 @@ def test_network_calc_tranceive(linux_handler):
             rate=9.0,
         ),
     }
-    for interface in output:
-        assert interface.transceive[0].model_dump(exclude="timestamp") == desired_transceive_output[
-            interface.name
-        ].model_dump(exclude="timestamp")
-
-
-def test_network_calc_avg_transceive_rate(linux_handler):
-    linux_handler.start_net_interface_measurement(interval=0.1)
-    time.sleep(0.1)
-    output = linux_handler.stop_net_interface_measurement()
-    desired_avg_transceive_output = {"lo": 3.0, "eth0": 9.0}
-    for interface in output:
-        assert interface.avg_transceive_rate == desired_avg_transceive_output[interface.name]
-
-
-def test_network_calc_avg_receive_rate(linux_handler):
-    linux_handler.start_net_interface_measurement(interval=0.1)
-    time.sleep(0.1)
-    output = linux_handler.stop_net_interface_measurement()
-    desired_avg_receive_output = {"lo": 1.0, "eth0": 4.0}
-    for interface in output:
-        assert interface.avg_receive_rate == desired_avg_receive_output[interface.name]
+    desired = {name: sample.model_dump(exclude={"timestamp"}) for name, sample in desired_transceive_output.items()}
+    for interface in net_measurement_output:
+        assert interface.transceive[0].model_dump(exclude={"timestamp"}) == desired[interface.name]
 
 
-def test_network_calc_avg_transmit_rate(linux_handler):
-    linux_handler.start_net_interface_measurement(interval=0.1)
-    time.sleep(0.1)
-    output = linux_handler.stop_net_interface_measurement()
-    desired_avg_transmit_output = {"lo": 2.0, "eth0": 5.0}
-    for interface in output:
-        assert interface.avg_transmit_rate == desired_avg_transmit_output[interface.name]
+@pytest.mark.parametrize(
+    "attribute, desired_output",
+    [
+        ("avg_transceive_rate", {"lo": 3.0, "eth0": 9.0}),
+        ("avg_receive_rate", {"lo": 1.0, "eth0": 4.0}),
+        ("avg_transmit_rate", {"lo": 2.0, "eth0": 5.0}),
+    ],
+)
+def test_network_calc_avg_rate(net_measurement_output, attribute, desired_output):
+    for interface in net_measurement_output:
+        assert getattr(interface, attribute) == desired_output[interface.name]
@@ -1,5 +1,6 @@
 import json
 
+import pytest
 import yaml
 
 from remoteperf.models.base import (
@@ -15,10 +16,17 @@ from remoteperf.models.linux import LinuxBootTimeInfo, LinuxCpuModeUsageInfo, Li
 from remoteperf.models.qnx import QnxCpuUsageInfo
 from remoteperf.models.super import CpuSampleProcessInfo, MemorySampleProcessInfo, ResourceSampleProcessInfo
 
+try:
+    from yaml import CSafeDumper as _SafeDumper
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:  # libyaml not available
+    from yaml import SafeDumper as _SafeDumper  # type: ignore[assignment]
+    from yaml import SafeLoader as _SafeLoader  # type: ignore[assignment]
+
 
 def reserialize_yaml(object: dict):
-    stringified_object = yaml.dump(object)
-    return yaml.safe_load(stringified_object)
+    stringified_object = yaml.dump(object, Dumper=_SafeDumper)
+    return yaml.load(stringified_object, Loader=_SafeLoader)
 
 
 def reserialize_json(object: dict):
@@ -26,132 +34,100 @@ def reserialize_json(object: dict):
     return json.loads(stringified_object)
 
 
-def test_model_cpu_linux():
-    model = LinuxCpuUsageInfo(
-        load=6,
-        cores={"0": 1, "1": 2, "3": 3},
-        mode_usage=LinuxCpuModeUsageInfo(
-            user=6.0, nice=0, system=0, idle=94.0, iowait=0, irq=0, softirq=0, steal=0, guest=0, guest_nice=0
+MODELS = [
+    pytest.param(
+        LinuxCpuUsageInfo(
+            load=6,
+            cores={"0": 1, "1": 2, "3": 3},
+            mode_usage=LinuxCpuModeUsageInfo(
+                user=6.0, nice=0, system=0, idle=94.0, iowait=0, irq=0, softirq=0, steal=0, guest=0, guest_nice=0
+            ),
         ),
-    )
-    assert (
-        model
-        == LinuxCpuUsageInfo(**reserialize_yaml(model.model_dump()))
-        == LinuxCpuUsageInfo(**reserialize_json(model.model_dump()))
-    )
-
-
-def test_model_cpu_qnx():
-    model = QnxCpuUsageInfo(load=25.4, cores={"0": 2.5, "1": 1.1, "2": 1.8, "3": 28.0})
-    assert (
-        model
-        == QnxCpuUsageInfo(**reserialize_yaml(model.model_dump()))
-        == QnxCpuUsageInfo(**reserialize_json(model.model_dump()))
-    )
-
-
-def test_model_cpu_proc_wise_qnx():
-    model = CpuSampleProcessInfo(
-        pid=1005,
-        name="classifier@1.0-",
-        command="/vendor/bin/hw/android.hardware.input.classifier@1.0-service.default",
-        samples=[
-            BaseCpuSample(cpu_load=1),
-        ],
-        start_time="5762",
-    )
-    assert (
-        model
-        == CpuSampleProcessInfo(**reserialize_yaml(model.model_dump()))
-        == CpuSampleProcessInfo(**reserialize_json(model.model_dump()))
-    )
-
-
-def test_model_cpu_proc_wise_linux():
-    model = ResourceSampleProcessInfo(
-        pid=1005,
-        name="classifier@1.0-",
-        command="/vendor/bin/hw/android.hardware.input.classifier@1.0-service.default",
-        samples=[
-            LinuxResourceSample(mem_usage=4316.0, cpu_load=0.0),
-        ],
-        start_time="5762",
-    )
-    assert (
-        model
-        == ResourceSampleProcessInfo(**reserialize_yaml(model.model_dump()))
-        == ResourceSampleProcessInfo(**reserialize_json(model.model_dump()))
-    )
-
-
-def test_model_mem_proc_wise_qnx():
-    model = MemorySampleProcessInfo(
-        pid=1005,
-        name="classifier@1.0-",
-        command="/vendor/bin/hw/android.hardware.input.classifier@1.0-service.default",
-        samples=[BaseMemorySample(mem_usage=1.0)],
-        start_time="5762",
-    )
-    assert (
-        model
-        == MemorySampleProcessInfo(**reserialize_yaml(model.model_dump()))
-        == MemorySampleProcessInfo(**reserialize_json(model.model_dump()))
-    )
-
-
-def test_model_mem_proc_wise_linux():
-    model = MemorySampleProcessInfo(
-        pid=1005,
-        name="classifier@1.0-",
-        command="/vendor/bin/hw/android.hardware.input.classifier@1.0-service.default",
-        samples=[
-            BaseMemorySample(mem_usage=1),
-        ],
-        start_time="5762",
-    )
-    assert (
-        model
-        == MemorySampleProcessInfo(**reserialize_yaml(model.model_dump()))
-        == MemorySampleProcessInfo(**reserialize_json(model.model_dump()))
-    )
-
-
-def test_model_extended_memory():
-    model = SystemMemory(
-        mem=ExtendedMemoryInfo(
-            total=32031624, used=6024668, free=18189336, shared=909004, buff_cache=7817620, available=24630432
+        id="cpu_linux",
+    ),
+    pytest.param(
+        QnxCpuUsageInfo(load=25.4, cores={"0": 2.5, "1": 1.1, "2": 1.8, "3": 28.0}),
+        id="cpu_qnx",
+    ),
+    pytest.param(
+        CpuSampleProcessInfo(
+            pid=1005,
+            name="classifier@1.0-",
+            command="/vendor/bin/hw/android.hardware.input.classifier@1.0-service.default",
+            samples=[
+                BaseCpuSample(cpu_load=1),
+            ],
+            start_time="5762",
         ),
-        swap=MemoryInfo(total=32031624, used=6024668, free=18189336),
-    )
-    assert (
-        model
-        == SystemMemory(**reserialize_yaml(model.model_dump()))
-        == SystemMemory(**reserialize_json(model.model_dump()))
-    )
-
-
-def test_model_boot_time():
-    model = BootTimeInfo(total=10)
-    assert (
-        model
-        == BootTimeInfo(**reserialize_yaml(model.model_dump()))
-        == BootTimeInfo(**reserialize_json(model.model_dump()))
-    )
-
-
-def test_model_linux_boot_time():
-    model = LinuxBootTimeInfo(total=10, extra={"kernel": 11.406, "userspace": 11.725, "graphical.target": 11.679})
-    assert (
-        model
-        == LinuxBootTimeInfo(**reserialize_yaml(model.model_dump()))
-        == LinuxBootTimeInfo(**reserialize_json(model.model_dump()))
-    )
-
-
-def test_model_uptime():
-    model = SystemUptimeInfo(total=10)
-    assert (
-        model
-        == SystemUptimeInfo(**reserialize_yaml(model.model_dump()))
-        == SystemUptimeInfo(**reserialize_json(model.model_dump()))
-    )
+        id="cpu_proc_wise_qnx",
+    ),
+    pytest.param(
+        ResourceSampleProcessInfo(
+            pid=1005,
+            name="classifier@1.0-",
+            command="/vendor/bin/hw/android.hardware.input.classifier@1.0-service.default",
+            samples=[
+                LinuxResourceSample(mem_usage=4316.0, cpu_load=0.0),
+            ],
+            start_time="5762",
+        ),
+        id="cpu_proc_wise_linux",
+    ),
+    pytest.param(
+        MemorySampleProcessInfo(
+            pid=1005,
+            name="classifier@1.0-",
+            command="/vendor/bin/hw/android.hardware.input.classifier@1.0-service.default",
+            samples=[BaseMemorySample(mem_usage=1.0)],
+            start_time="5762",
+        ),
+        id="mem_proc_wise_qnx",
+    ),
+    pytest.param(
+        MemorySampleProcessInfo(
+            pid=1005,
+            name="classifier@1.0-",
+            command="/vendor/bin/hw/android.hardware.input.classifier@1.0-service.default",
+            samples=[
+                BaseMemorySample(mem_usage=1),
+            ],
+            start_time="5762",
+        ),
+        id="mem_proc_wise_linux",
+    ),
+    pytest.param(
+        SystemMemory(
+            mem=ExtendedMemoryInfo(
+                total=32031624, used=6024668, free=18189336, shared=909004, buff_cache=7817620, available=24630432
+            ),
+            swap=MemoryInfo(total=32031624, used=6024668, free=18189336),
+        ),
+        id="extended_memory",
+    ),
+    pytest.param(
+        BootTimeInfo(total=10),
+        id="boot_time",
+    ),
+    pytest.param(
+        LinuxBootTimeInfo(total=10, extra={"kernel": 11.406, "userspace": 11.725, "graphical.target": 11.679}),
+        id="linux_boot_time",
+    ),
+    pytest.param(
+        SystemUptimeInfo(total=10),
+        id="uptime",
+    ),
+]
+
+
+@pytest.mark.parametrize("model", MODELS)
+def test_model(model):
+    dumped = model.model_dump()
+    assert model == type(model)(**reserialize_yaml(dumped)) == type(model)(**reserialize_json(dumped))
+
+
+def test_float_subclass_rounded():
+    class Seconds(float):
+        pass
+
+    assert SystemUptimeInfo(total=Seconds(1.23456)).total == 1.235
+    assert SystemUptimeInfo(total=1.23456).total == 1.235
@@ -38,8 +38,8 @@ def broken_qnx_handler(broken_mock_client):
     yield handler
 
 
-def test_memory(qnx_handler):
-    output = qnx_handler.get_mem_usage()
+def test_memory(shared_qnx_handler):
+    output = shared_qnx_handler.get_mem_usage()
     assert output.mem == MemoryInfo(total=12944670, used=12818251, free=126418)
 
 
@@ -48,8 +48,8 @@ def test_exception_memory(broken_qnx_handler):
         broken_qnx_handler.get_mem_usage()
 
 
-def test_system_uptime(qnx_handler):
-    output = qnx_handler.get_system_uptime()
+def test_system_uptime(shared_qnx_handler):
+    output = shared_qnx_handler.get_system_uptime()
     assert output.total == 3600.0
     assert isinstance(output, SystemUptimeInfo)
 
@@ -59,18 +59,16 @@ def test_exception_system_uptime(broken_qnx_handler):
         broken_qnx_handler.get_system_uptime()
 
 
-def test_cpu_load(qnx_handler):
-    output = qnx_handler.get_cpu_usage(interval=1)
-    assert output.model_dump(exclude={"timestamp"}) == {
-        "cores": {"0": 25, "1": 20, "2": 13, "3": 33, "4": 27, "5": 24},
-        "load": 23.67,
-    }
+def test_cpu_load(shared_qnx_handler):
+    output = shared_qnx_handler.get_cpu_usage(interval=1)
+    assert output.load == 23.67
+    assert output.cores == {"0": 25, "1": 20, "2": 13, "3": 33, "4": 27, "5": 24}
     assert isinstance(output, BaseCpuUsageInfo)
     assert isinstance(output, QnxCpuUsageInfo)
 
 
-def test_get_boot_time(qnx_handler):
-    output = qnx_handler.get_boot_time()
+def test_get_boot_time(shared_qnx_handler):
+    output = shared_qnx_handler.get_boot_time()
     assert output.total == 0.785
     assert isinstance(output, BootTimeInfo)
 
@@ -80,48 +78,52 @@ def test_exception_get_boot_time(broken_qnx_handler):
         broken_qnx_handler.get_boot_time()
 
 
-def test_continuous_cpu_load(qnx_handler):
-    qnx_handler.start_cpu_measurement(1)
+@pytest.fixture(scope="module")
+def continuous_qnx_output(shared_qnx_handler):
+    # All continuous measurements run side by side and share a single wait
+    shared_qnx_handler.start_cpu_measurement(1)
+    shared_qnx_handler.start_mem_measurement(0.1)
+    shared_qnx_handler.start_cpu_measurement_proc_wise(1, read_delay=0.1)
+    shared_qnx_handler.start_mem_measurement_proc_wise(1)
     time.sleep(0.5)
-    output = qnx_handler.stop_cpu_measurement()
+    # Stopped cheapest first, a stop waits for the sample in progress and the others keep sampling meanwhile
+    output = {"mem_proc_wise": shared_qnx_handler.stop_mem_measurement_proc_wise()}
+    output["cpu_proc_wise"] = shared_qnx_handler.stop_cpu_measurement_proc_wise()
+    output["mem"] = shared_qnx_handler.stop_mem_measurement()
+    output["cpu"] = shared_qnx_handler.stop_cpu_measurement()
+    return output
+
+
+def test_continuous_cpu_load(continuous_qnx_output):
+    output = continuous_qnx_output["cpu"]
     for model in output:
-        assert model.model_dump(exclude={"timestamp"}) == {
-            "cores": {"0": 25, "1": 20, "2": 13, "3": 33, "4": 27, "5": 24},
-            "load": 23.67,
-        }
+        assert model.load == 23.67
+        assert model.cores == {"0": 25, "1": 20, "2": 13, "3": 33, "4": 27, "5": 24}
         assert isinstance(model, BaseCpuUsageInfo)
         assert isinstance(model, QnxCpuUsageInfo)
 
 
-def test_continuous_memory(qnx_handler):
-    qnx_handler.start_mem_measurement(0.1)
-    time.sleep(0.5)
-    output = qnx_handler.stop_mem_measurement()
+def test_continuous_memory(continuous_qnx_output):
+    output = continuous_qnx_output["mem"]
     for model in output:
-        assert model.mem.model_dump() == {"free": 126418, "total": 12944670, "used": 12818251}
+        assert model.mem == MemoryInfo(total=12944670, used=12818251, free=126418)
         assert isinstance(model, SystemMemory)
 
 
-def test_continuous_cpu_load_proc_wise_count(qnx_handler):
-    qnx_handler.start_cpu_measurement_proc_wise(1)
-    time.sleep(0.5)
-    output = qnx_handler.stop_cpu_measurement_proc_wise()
+def test_continuous_cpu_load_proc_wise_count(continuous_qnx_output):
+    output = continuous_qnx_output["cpu_proc_wise"]
     # Range to account for flakeyness and potentially overloaded node processor in CI
     assert len(output[0].samples) <= 2
 
 
-def test_continuous_mem_load_proc_wise_count(qnx_handler):
-    qnx_handler.start_mem_measurement_proc_wise(1)
-    time.sleep(0.5)
-    output = qnx_handler.stop_mem_measurement_proc_wise()
+def test_continuous_mem_load_proc_wise_count(continuous_qnx_output):
+    output = continuous_qnx_output["mem_proc_wise"]
     # Range to account for flakeyness and potentially overloaded node processor in CI
     assert len(output[0].samples) <= 2
 
 
-def test_continuous_cpu_load_proc_wise_values(qnx_handler):
-    qnx_handler.start_cpu_measurement_proc_wise(1)
-    time.sleep(0.5)
-    output = qnx_handler.stop_cpu_measurement_proc_wise()
+def test_continuous_cpu_load_proc_wise_values(continuous_qnx_output):
+    output = continuous_qnx_output["cpu_proc_wise"]
     reference = CpuSampleProcessInfo(
         pid=1,
         name="init",
@@ -129,14 +131,12 @@ def test_continuous_cpu_load_proc_wise_values(qnx_handler):
         start_time="Oct 04 05:27",
         samples=[BaseCpuSample(cpu_load=7.0)],
     )
-    assert output[0].model_dump(exclude="samples") == reference.model_dump(exclude="samples")
-    assert output[0].samples[0].model_dump(exclude="timestamp") == reference.samples[0].model_dump(exclude="timestamp")
+    assert output[0].model_dump(exclude={"samples"}) == reference.model_dump(exclude={"samples"})
+    assert output[0].samples[0].cpu_load == reference.samples[0].cpu_load
 
 
-def test_continuous_mem_load_proc_wise_values(qnx_handler):
-    qnx_handler.start_mem_measurement_proc_wise(1)
-    time.sleep(0.5)
-    output = qnx_handler.stop_mem_measurement_proc_wise()
+def test_continuous_mem_load_proc_wise_values(continuous_qnx_output):
+    output = continuous_qnx_output["mem_proc_wise"]
     reference = MemorySampleProcessInfo(
         pid=1,
         command="/sbin/init splash",
@@ -148,20 +148,20 @@ def test_continuous_mem_load_proc_wise_values(qnx_handler):
             )
         ],
     )
-    assert output[0].model_dump(exclude="samples") == reference.model_dump(exclude="samples")
-    assert output[0].samples[0].model_dump(exclude="timestamp") == reference.samples[0].model_dump(exclude="timestamp")
+    assert output[0].model_dump(exclude={"samples"}) == reference.model_dump(exclude={"samples"})
+    assert output[0].samples[0].mem_usage == reference.samples[0].mem_usage
 
 
-def test_len_cpu_measurement_proc_wise(qnx_handler):
-    data = qnx_handler.get_cpu_usage_proc_wise(read_delay=0.1)
+def test_len_cpu_measurement_proc_wise(shared_qnx_handler):
+    data = shared_qnx_handler.get_cpu_usage_proc_wise(read_delay=0.1)
     assert len(data) == 6
     for model in data:
         assert isinstance(model, ProcessInfo)
         assert isinstance(model.samples[0], BaseCpuSample)
 
 
-def test_valid_cpu_measurement_proc_wise(qnx_handler):
-    data = qnx_handler.get_cpu_usage_proc_wise(read_delay=0.1)
+def test_valid_cpu_measurement_proc_wise(shared_qnx_handler):
+    data = shared_qnx_handler.get_cpu_usage_proc_wise(read_delay=0.1)
     data = data[0].model_dump(exclude={"timestamp"})
 
     for i, sample in enumerate(data["samples"]):
@@ -177,8 +177,8 @@ def test_valid_cpu_measurement_proc_wise(qnx_handler):
     }
 
 
-def test_length_memory_info_proc_wise(qnx_handler):
-    data = qnx_handler.get_mem_usage_proc_wise()
+def test_length_memory_info_proc_wise(shared_qnx_handler):
+    data = shared_qnx_handler.get_mem_usage_proc_wise()
     assert len(data) == 6
     for model in data:
         assert isinstance(model, ProcessInfo)
@@ -186,8 +186,8 @@ def test_length_memory_info_proc_wise(qnx_handler):
         assert isinstance(model.samples[0], BaseMemorySample)
 
 
-def test_valid_memory_info_proc_wise(qnx_handler):
-    data = qnx_handler.get_mem_usage_proc_wise()
+def test_valid_memory_info_proc_wise(shared_qnx_handler):
+    data = shared_qnx_handler.get_mem_usage_proc_wise()
     data = data[0].model_dump(exclude={"timestamp"})
     reference = {
         "pid": 1,
@@ -199,18 +199,14 @@ def test_valid_memory_info_proc_wise(qnx_handler):
     assert data == reference
 
 
-def test_type_process_qnx(qnx_handler: QNXHandler):
-    qnx_handler.start_mem_measurement_proc_wise(0.1)
-    time.sleep(0.5)
-    output = qnx_handler.stop_mem_measurement_proc_wise()[:2]
+def test_type_process_qnx(continuous_qnx_output):
+    output = continuous_qnx_output["mem_proc_wise"][:2]
     assert isinstance(output, ModelList)
     assert output.__class__ == ProcessMemoryList
 
 
-def test_type_memory_list_qnx(qnx_handler: QNXHandler):
-    qnx_handler.start_mem_measurement_proc_wise(0.1)
-    time.sleep(0.5)
-    output = qnx_handler.stop_mem_measurement_proc_wise()[:2]
+def test_type_memory_list_qnx(continuous_qnx_output):
+    output = continuous_qnx_output["mem_proc_wise"][:2]
     assert output[0].__class__ == MemorySampleProcessInfo
 
 
@@ -263,10 +259,9 @@ def test_network_usage_total(qnx_handler):
             ),
         ),
     ]
-    for interface in output:
-        assert interface.model_dump(exclude=["timestamp"]) == desired_output_total.pop(0).model_dump(
-            exclude=["timestamp"]
-        )
+    assert [interface.model_dump(exclude={"timestamp"}) for interface in output] == [
+        interface.model_dump(exclude={"timestamp"}) for interface in desired_output_total
+    ]
 
 
 desired_output = QnxNetworkInterfaceList(
@@ -322,12 +317,11 @@ desired_output = QnxNetworkInterfaceList(
 
 
 def test_network_usage(qnx_handler):
-    output = qnx_handler.get_network_usage(interval=1)
+    output = qnx_handler.get_network_usage(interval=0.01)
     # Rate and timestamp are not deterministic for QNX and tested in linux function
+    desired = desired_output.model_dump(exclude={"timestamp", "sampletimediff", "rate"})
     for interface in output:
-        assert interface.model_dump(exclude=["timestamp", "sampletimediff", "rate"]) in desired_output.model_dump(
-            exclude=["timestamp", "sampletimediff", "rate"]
-        )
+        assert interface.model_dump(exclude={"timestamp", "sampletimediff", "rate"}) in desired
 
 
 def test_network_usage_continuous(qnx_handler):
@@ -335,10 +329,9 @@ def test_network_usage_continuous(qnx_handler):
     time.sleep(0.1)
     output = qnx_handler.stop_net_interface_measurement()
     # Rate and timestamp are not deterministic for QNX and tested in linux function
+    desired = desired_output.model_dump(exclude={"timestamp", "sampletimediff", "rate"})
     for interface in output:
-        assert interface.model_dump(exclude=["timestamp", "sampletimediff", "rate"]) in desired_output.model_dump(
-            exclude=["timestamp", "sampletimediff", "rate"]
-        )
+        assert interface.model_dump(exclude={"timestamp", "sampletimediff", "rate"}) in desired
 
 
 def test_network_calc_tranceive(qnx_handler):
@@ -357,10 +350,11 @@ def test_network_calc_tranceive(qnx_handler):
             rate=9.0,
         ),
     }
+    desired = {
+        name: sample.model_dump(exclude={"timestamp", "rate"}) for name, sample in desired_transceive_output.items()
+    }
     for interface in output:
-        assert interface.transceive[0].model_dump(exclude=["timestamp", "rate"]) == desired_transceive_output[
-            interface.name
-        ].model_dump(exclude=["timestamp", "rate"])
+        assert interface.transceive[0].model_dump(exclude={"timestamp", "rate"}) == desired[interface.name]
 
 
 def test_network_calc_avg_transceive_rate(qnx_handler):
@@ -392,52 +386,37 @@ def test_network_calc_avg_transmit_rate(qnx_handler):
         assert interface.avg_transmit_rate < desired_avg_transmit_output[interface.name] * 1.05
 
 
+desired_output_info = DiskInfoList(
+    [
+        DiskInfo(
+            filesystem="/dev/sda",
+            size=7654321,
+            used=0,
+            available=1234567,
+            used_percent=11,
+            mounted_on="/",
+        ),
+        DiskInfo(
+            filesystem="/dev/sdb",
+            size=654321,
+            used=0,
+            available=123456,
+            used_percent=10,
+            mounted_on="/",
+        ),
+    ],
+)
+
+
 def test_disc_info(unique_qnx_handler):
     output = unique_qnx_handler.get_diskinfo()
-    desired_output = DiskInfoList(
-        [
-            DiskInfo(
-                filesystem="/dev/sda",
-                size=7654321,
-                used=0,
-                available=1234567,
-                used_percent=11,
-                mounted_on="/",
-            ),
-            DiskInfo(
-                filesystem="/dev/sdb",
-                size=654321,
-                used=0,
-                available=123456,
-                used_percent=10,
-                mounted_on="/",
-            ),
-        ],
-    )
-    for model in output.model_dump(exclude="timestamp"):
-        assert model in desired_output.model_dump(exclude="timestamp")
+    for model in output:
+        assert model in desired_output_info
 
 
 def test_disc_info_cont(unique_qnx_handler):
     unique_qnx_handler.start_diskinfo_measurement(0.1)
     time.sleep(0.1)
     output = unique_qnx_handler.stop_diskinfo_measurement()
-    disc_info_sda = DiskInfo(
-        filesystem="/dev/sda",
-        size=7654321,
-        used=0,
-        available=1234567,
-        used_percent=11,
-        mounted_on="/",
-    )
-    disc_info_sdb = DiskInfo(
-        filesystem="/dev/sdb",
-        size=654321,
-        used=0,
-        available=123456,
-        used_percent=10,
-        mounted_on="/",
-    )
-    desired_output = DiskInfoList([disc_info_sda, disc_info_sdb])
-    for model in output.model_dump(exclude="timestamp"):
-        assert model in desired_output.model_dump(exclude="timestamp")
+    for model in output:
+        assert model in desired_output_info
@@ -1,4 +1,8 @@
-from unittest.mock import patch
+import re
+import socket
+import threading
+import time
+from unittest.mock import MagicMock, patch
 
 import pytest
 from paramiko import AuthenticationException, SSHException
@@ -6,50 +10,202 @@ from paramiko import AuthenticationException, SSHException
 from remoteperf.clients.ssh_client import SSHClient, SSHClientException
 
 
+class FakeShell:
+    """Stands in for the channel running sh, answering every command with the same output"""
+
+    def __init__(self, output: bytes = b"", *, chunk_size=None, finish=True, close=False):
+        self._output = output
+        self._chunk_size = chunk_size
+        self._finish = finish
+        self._close = close
+        self._pending = []
+        self.closed = False
+        self.command = None
+
+    def exec_command(self, command):
+        self.command = command
+
+    def sendall(self, data: bytes):
+        marker = re.search(rb"__remoteperf_\w+__", data).group()
+        # Like the printf after each command, the marker goes on a line of its own
+        response = self._output + (b"\n" + marker + b"\n" if self._finish else b"")
+        size = self._chunk_size or len(response) or 1
+        self._pending = [response[i : i + size] for i in range(0, len(response), size)]
+
+    def settimeout(self, timeout):
+        pass
+
+    def recv(self, _):
+        if self._pending:
+            return self._pending.pop(0)
+        if self._close:
+            return b""
+        raise socket.timeout()
+
+    def close(self):
+        self.closed = True
+
+
 @pytest.fixture
 def ssh_client():
     return SSHClient("host", port=22, username="username", password="password")
 
 
-def test_connect(ssh_client):
-    with patch("paramiko.SSHClient") as mock_ssh:
-        mock_ssh.return_value = mock_ssh
-        mock_ssh.connect.return_value = None
-        ssh_client.connect()
-        mock_ssh.connect.assert_called_once_with(
-            "host", port=22, username="username", password="password", timeout=10, auth_timeout=10, sock=None
-        )
+@pytest.fixture
+def mock_ssh():
+    with patch("paramiko.SSHClient") as mock:
+        mock.return_value = mock
+        yield mock
 
 
-def test_connect_authentification_error(ssh_client):
-    with patch("paramiko.SSHClient") as mock_ssh:
-        mock_ssh.return_value = mock_ssh
-        mock_ssh.connect.side_effect = AuthenticationException
-        with pytest.raises(SSHClientException):
-            ssh_client.connect()
+def test_connect(ssh_client, mock_ssh):
+    mock_ssh.connect.return_value = None
+    ssh_client.connect()
+    mock_ssh.connect.assert_called_once_with(
+        "host", port=22, username="username", password="password", timeout=10, auth_timeout=10, sock=None
+    )
 
 
-def test_connect_ssh_exception(ssh_client):
-    with patch("paramiko.SSHClient") as mock_ssh:
-        mock_ssh.return_value = mock_ssh
-        mock_ssh.connect.side_effect = SSHException
-        with pytest.raises(SSHClientException):
-            ssh_client.connect()
+def test_connect_authentification_error(ssh_client, mock_ssh):
+    mock_ssh.connect.side_effect = AuthenticationException
+    with pytest.raises(SSHClientException):
+        ssh_client.connect()
 
 
-def test_disconnect(ssh_client):
-    with patch("paramiko.SSHClient") as mock_ssh:
-        mock_ssh.return_value = mock_ssh
-        mock_ssh.connect.return_value = None
+def test_connect_ssh_exception(ssh_client, mock_ssh):
+    mock_ssh.connect.side_effect = SSHException
+    with pytest.raises(SSHClientException):
         ssh_client.connect()
-        assert ssh_client._client is not None
+
+
+def test_disconnect(ssh_client, mock_ssh):
+    mock_ssh.connect.return_value = None
+    ssh_client.connect()
+    assert ssh_client._client is not None
+    ssh_client.disconnect()
+    assert ssh_client._client is None
+    mock_ssh.close.assert_called_once()
+
+
+def test_disconnect_no_connection(ssh_client, mock_ssh):
+    with pytest.raises(SSHClientException):
         ssh_client.disconnect()
-        assert ssh_client._client is None
-        mock_ssh.close.assert_called_once()
 
 
-def test_disconnect_no_connection(ssh_client):
-    with patch("paramiko.SSHClient") as mock_ssh:
-        mock_ssh.return_value = mock_ssh
-        with pytest.raises(SSHClientException):
-            ssh_client.disconnect()
+@pytest.fixture
+def connected_ssh_client(ssh_client, mock_ssh):
+    ssh_client.connect()
+    # The remote/local path checks are covered by the filesystem tests, these tests are about the transfers
+    with patch.object(SSHClient, "_check_pull", side_effect=lambda path, dest: (path, dest)):
+        yield ssh_client
+
+
+def test_pull_files(connected_ssh_client):
+    channels = []
+
+    def open_sftp(*_, **__):
+        channels.append(MagicMock())
+        return channels[-1]
+
+    files = [(f"/remote/{i}", f"/local/{i}") for i in range(6)]
+    with patch("paramiko.SFTPClient.from_transport", side_effect=open_sftp):
+        connected_ssh_client.pull_files(files)
+    pulled = [call.args for channel in channels for call in channel.get.call_args_list]
+    assert sorted(pulled) == sorted(files)
+    assert len(channels) == 4
+    assert all(channel.close.called for channel in channels)
+
+
+def test_pull_files_fallback(connected_ssh_client):
+    pulls = []
+
+    def get(path, dest):
+        if path == "/remote/2" and not any(pulled[0] == path for pulled in pulls):
+            pulls.append((path, None))
+            raise EOFError("Channel closed")
+        pulls.append((path, threading.current_thread()))
+
+    sftp = MagicMock()
+    sftp.get.side_effect = get
+    files = [(f"/remote/{i}", f"/local/{i}") for i in range(6)]
+    with patch("paramiko.SFTPClient.from_transport", return_value=sftp):
+        connected_ssh_client.pull_files(files)
+    assert sorted(path for path, thread in pulls if thread) == sorted(path for path, _ in files)
+    # The failed file is retried after the workers are done, on the calling thread
+    assert pulls[-1] == ("/remote/2", threading.current_thread())
+
+
+def test_run_in_shell_split_output():
+    # Small enough chunks that the marker itself is split between reads
+    shell = FakeShell(b"line 1\nline 2\n", chunk_size=5)
+    assert SSHClient._run_in_shell(shell, "cat file", timeout=1) == "line 1\nline 2\n"
+
+
+def test_run_in_shell_no_trailing_newline():
+    assert SSHClient._run_in_shell(FakeShell(b"1"), "printf 1", timeout=1) == "1"
+
+
+def test_run_in_shell_timeout():
+    with pytest.raises(TimeoutError, match="partial"):
+        SSHClient._run_in_shell(FakeShell(b"partial", finish=False), "sleep 10", timeout=1)
+
+
+def test_run_in_shell_closed():
+    with pytest.raises(SSHClientException, match="Shell closed"):
+        SSHClient._run_in_shell(FakeShell(b"partial", finish=False, close=True), "exit", timeout=1)
+
+
+def test_shell(ssh_client, mock_ssh):
+    mock_ssh.get_transport.return_value.open_session.return_value = FakeShell(b"output")
+    ssh_client.connect()
+    assert ssh_client.run_command("echo output") == "output"
+    assert ssh_client._shell is not None
+
+
+def test_shell_unsupported(ssh_client, mock_ssh):
+    # The exec request is accepted, but sh exits without running anything
+    shell = FakeShell(finish=False, close=True)
+    mock_ssh.get_transport.return_value.open_session.return_value = shell
+    ssh_client.connect()
+    assert ssh_client._get_shell() is None
+    assert shell.closed
+    assert not ssh_client._shell_supported
+
+
+@pytest.mark.parametrize(
+    "command, output",
+    [
+        ("echo 'a  b'; echo \"$((1 + 1))\"", "a  b\n2\n"),
+        ("cat <<EOF\nline\nEOF", "line\n"),
+        ("cd /; pwd", "/\n"),
+        ("exit 3", ""),
+    ],
+)
+def test_run_in_shell_local(local_shell, command, output):
+    assert SSHClient._run_in_shell(local_shell, command, timeout=5) == output
+    # Nothing the command did (cd, exit...) leaks into the next one
+    assert SSHClient._run_in_shell(local_shell, "pwd; echo next", timeout=5).endswith("next\n")
+
+
+@pytest.mark.parametrize("command", ["echo 'unbalanced", "cat <<EOF\nline", 'echo "$(', "if true; then"])
+def test_run_in_shell_incomplete_command(local_shell, command):
+    # Fails on its own instead of waiting out the timeout for the swallowed marker
+    t0 = time.time()
+    SSHClient._run_in_shell(local_shell, command, timeout=5)
+    assert time.time() - t0 < 2
+    assert SSHClient._run_in_shell(local_shell, "echo next", timeout=5) == "next\n"
+
+
+def test_shell_reset_on_connect(ssh_client, mock_ssh):
+    session = mock_ssh.get_transport.return_value.open_session
+    session.return_value = FakeShell(finish=False, close=True)
+    ssh_client.connect()
+    assert ssh_client._get_shell() is None
+    ssh_client.disconnect()
+    # Tried again on the new connection
+    session.return_value = FakeShell(b"output")
+    ssh_client.connect()
+    assert ssh_client.run_command("echo output") == "output"
+    assert ssh_client._shell is session.return_value
+    # Runs the commands in the user's login shell, like the sessions do
+    assert ssh_client._shell.command == 'exec "${SHELL:-sh}"'
@@ -0,0 +1,52 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from remoteperf.utils.threading import DelegatedExecutionThread, ThreadException
+
+
+def test_delegated_reads_do_not_queue():
+    reads = []
+
+    def run_command(command):
+        reads.append(command)
+        return "output"
+
+    client = MagicMock()
+    client.run_command.side_effect = run_command
+    # More pending reads than the pool has workers, none of them may hold a worker while waiting
+    waiting = [DelegatedExecutionThread(client, "hogs", "waiting", read_delay=0.5) for _ in range(64)]
+    delegated = DelegatedExecutionThread(client, "hogs", "due", read_delay=0)
+    for thread in [delegated, *waiting]:
+        assert thread.output == "output"
+    cats = [command for command in reads if command.startswith("cat ")]
+    assert cats[0].startswith("cat /tmp/remoteperf_delayed_due")
+
+
+def test_delegated_read_pool_shut_down():
+    client = MagicMock()
+    client.run_command.return_value = "output"
+    with patch.object(DelegatedExecutionThread, "_executor", ThreadPoolExecutor()) as executor:
+        executor.shutdown()
+        delegated = DelegatedExecutionThread(client, "hogs", "test", read_delay=0)
+        with pytest.raises(RuntimeError):
+            _ = delegated.output
+
+
+def test_delegated_read_retries():
+    client = MagicMock()
+    client.run_command.side_effect = ["", "cat: No such file or directory", "", "output", ""]
+    delegated = DelegatedExecutionThread(client, "hogs", "test", read_delay=0, join=True)
+    assert delegated.output == "output"
+    assert delegated.timestamp is not None
+    assert client.run_command.call_args.args[0].startswith("rm /tmp/remoteperf_delayed_test")
+
+
+def test_delegated_read_timeout():
+    client = MagicMock()
+    client.run_command.return_value = ""
+    delegated = DelegatedExecutionThread(client, "hogs", "test", read_delay=0, retries=0, join=True)
+    assert isinstance(delegated.exception, ThreadException)
+    with pytest.raises(ThreadException):
+        _ = delegated.output